@@ -4,7 +4,6 @@ GET /api/analysis?symbol=BTCUSDT - Returns technical analysis for a specific sym
 """
 
 from http.server import BaseHTTPRequestHandler
-import json
 import sys
 import os
 from urllib.parse import parse_qs, urlparse
@@ -14,27 +13,28 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
 from binance_client import BinanceClient
 from technical import TechnicalAnalysis
+from http_utils import JSONResponseMixin, qparam
 
-class handler(BaseHTTPRequestHandler):
+# Shared across warm invocations of this function
+binance_client = BinanceClient()
+tech_analysis = TechnicalAnalysis()
+
+class handler(JSONResponseMixin, BaseHTTPRequestHandler):
     def do_GET(self):
         try:
             # Parse query parameters
             parsed_url = urlparse(self.path)
             query_params = parse_qs(parsed_url.query)
             
-            symbol = query_params.get('symbol', [None])[0]
-            days = int(query_params.get('days', [100])[0])
-            days = min(days, 365)  # Limit to prevent timeouts
+            symbol = qparam(query_params, 'symbol', None, cast=str)
+            days = qparam(query_params, 'days', 100, cap=365)  # Limit to prevent timeouts
             
             if not symbol:
                 raise ValueError("Symbol parameter is required")
             
-            # Initialize clients
-            binance_client = BinanceClient()
-            tech_analysis = TechnicalAnalysis()
-            
             # Fetch historical data
             df = binance_client.get_historical_klines(symbol, '1d', days)
+            binance_client.persist_cache()
             
             if df.empty:
                 response_data = {
@@ -44,8 +44,21 @@ class handler(BaseHTTPRequestHandler):
                 }
             else:
                 # Calculate technical analysis
-                ma_data = tech_analysis.calculate_all_ma(df, symbol)
-                crossovers = tech_analysis.detect_crossovers(df, symbol)
+                if len(df) < max(tech_analysis.ma_periods):
+                    # Too short for the longest MA, so no crossover is reported: skip detection
+                    # (windows longer than the history come back as all-None entries)
+                    ma_data = tech_analysis.calculate_all_ma(df, symbol)
+                    crossovers = []
+                else:
+                    ma_data, crossovers = tech_analysis.calculate_all_ma_and_crossovers(df, symbol)
+                
+                # Count crossover types in a single pass
+                golden_crosses = 0
+                death_crosses = 0
+                for crossover in crossovers:
+                    crossover_type = crossover['type']
+                    golden_crosses += crossover_type == 'GOLDEN_CROSS'
+                    death_crosses += crossover_type == 'DEATH_CROSS'
                 
                 response_data = {
                     'success': True,
@@ -60,21 +73,13 @@ class handler(BaseHTTPRequestHandler):
                     },
                     'summary': {
                         'total_crossovers': len(crossovers),
-                        'golden_crosses': len([c for c in crossovers if c['type'] == 'GOLDEN_CROSS']),
-                        'death_crosses': len([c for c in crossovers if c['type'] == 'DEATH_CROSS'])
+                        'golden_crosses': golden_crosses,
+                        'death_crosses': death_crosses
                     }
                 }
             
-            # Set response headers
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-            self.send_header('Cache-Control', 'public, max-age=600')  # 10 minutes cache
-            self.end_headers()
-            
-            # Send response
-            self.wfile.write(json.dumps(response_data, indent=2).encode())
+            # Send response (serialized before the status line goes out)
+            self._send_json(200, response_data, cache_control='public, max-age=600')  # 10 minutes cache
             
         except ValueError as e:
             # Client error
@@ -84,12 +89,7 @@ class handler(BaseHTTPRequestHandler):
                 'message': 'Invalid request parameters'
             }
             
-            self.send_response(400)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            self.wfile.write(json.dumps(error_response, indent=2).encode())
+            self._send_json(400, error_response)
             
         except Exception as e:
             # Server error
@@ -99,17 +99,11 @@ class handler(BaseHTTPRequestHandler):
                 'message': 'Failed to analyze cryptocurrency data'
             }
             
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            self.wfile.write(json.dumps(error_response, indent=2).encode())
+            self._send_json(500, error_response)
     
     def do_OPTIONS(self):
         # Handle CORS preflight
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self._cors()
+        self.send_header('Content-Length', '0')
         self.end_headers()
\ No newline at end of file
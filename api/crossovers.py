@@ -4,68 +4,106 @@ GET /api/crossovers - Returns all detected crossovers for top cryptocurrencies
 """
 
 from http.server import BaseHTTPRequestHandler
-import json
+import orjson
+import numpy as np
 import sys
 import os
 from urllib.parse import parse_qs, urlparse
+from datetime import datetime, timezone
+from heapq import merge
+from operator import itemgetter
 import time
+from typing import List
 
 # Add utils to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
 from binance_client import BinanceClient
 from technical import TechnicalAnalysis
+from http_utils import JSONResponseMixin, qparam
 
-class handler(BaseHTTPRequestHandler):
+# Shared across warm invocations of this function
+binance_client = BinanceClient()
+tech_analysis = TechnicalAnalysis()
+
+# Concurrent kline fetches (Vercel has 10-second limit)
+FETCH_WORKERS = 16
+FETCH_TIMEOUT_SECONDS = 7.5
+
+def _most_recent_first(crossovers, seqs):
+    """Sort crossovers by timestamp, newest first (ties keep collection order).
+
+    seqs holds each crossover's position in the combined collection order; returns
+    (sorted_list, sorted_keys) with ascending (-timestamp_ms, seq) keys for merging.
+    """
+    if not crossovers:
+        return [], []
+    keys = np.array([c['timestamp'] for c in crossovers], dtype='datetime64[ms]').astype(np.int64)
+    order = np.argsort(-keys, kind='stable').tolist()
+    return [crossovers[i] for i in order], [(-int(keys[i]), seqs[i]) for i in order]
+
+class handler(JSONResponseMixin, BaseHTTPRequestHandler):
     def do_GET(self):
         try:
+            request_start = time.time()  # FETCH_TIMEOUT_SECONDS budget starts here
+            
+            # Request timestamp (UTC, millisecond precision)
+            timestamp = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+            
             # Parse query parameters
             parsed_url = urlparse(self.path)
             query_params = parse_qs(parsed_url.query)
             
-            count = int(query_params.get('count', [50])[0])  # Limit to prevent timeout
-            count = min(count, 100)  # Max 100 symbols
-            days = int(query_params.get('days', [60])[0])
-            days = min(days, 100)  # Limit historical data
-            
-            # Initialize clients
-            binance_client = BinanceClient()
-            tech_analysis = TechnicalAnalysis()
+            count = qparam(query_params, 'count', 50, cap=100)  # Max 100 symbols to prevent timeout
+            days = qparam(query_params, 'days', 60, cap=100)  # Limit historical data
             
             # Get top symbols
             top_symbols_data = binance_client.get_top_symbols_by_volume(count)
             symbols = [s['symbol'] for s in top_symbols_data]
             
-            all_crossovers = []
+            golden_crosses = []
+            death_crosses = []
+            golden_seqs = []
+            death_seqs = []
             processed_symbols = 0
             start_time = time.time()
             
-            # Process symbols (with timeout protection)
+            # Fetch historical data for all symbols concurrently within the remaining budget
+            remaining = max(FETCH_TIMEOUT_SECONDS - (time.time() - request_start), 0)
+            klines = binance_client.get_many_historical_klines(
+                symbols, '1d', days,
+                timeout=remaining, max_workers=FETCH_WORKERS
+            )
+            binance_client.persist_cache()
+            
+            # Process symbols in rank order (skipping timed-out fetches)
             for symbol_data in top_symbols_data:
                 symbol = symbol_data['symbol']
-                
-                # Check timeout (Vercel has 10-second limit)
-                if time.time() - start_time > 8:  # Leave 2 seconds buffer
-                    break
+                df = klines.get(symbol)
+                if df is None:
+                    continue
                 
                 try:
-                    # Get historical data
-                    df = binance_client.get_historical_klines(symbol, '1d', days)
-                    
                     if not df.empty:
                         # Detect crossovers
                         crossovers = tech_analysis.detect_crossovers(df, symbol)
                         
                         # Add additional symbol info to crossovers
-                        for crossover in crossovers:
-                            crossover.update({
-                                'rank': symbol_data['rank'],
-                                'current_price': symbol_data['price'],
-                                'change_24h': symbol_data['change_24h'],
-                                'volume_24h': symbol_data['quote_volume_24h']
-                            })
-                        
-                        all_crossovers.extend(crossovers)
+                        rank = symbol_data['rank']
+                        current_price = symbol_data['price']
+                        change_24h = symbol_data['change_24h']
+                        volume_24h = symbol_data['quote_volume_24h']
+                        for c in crossovers:
+                            enriched = {**c, 'rank': rank, 'current_price': current_price,
+                                        'change_24h': change_24h, 'volume_24h': volume_24h}
+                            # Partition by type as we go, remembering the combined collection order
+                            seq = len(golden_crosses) + len(death_crosses)
+                            if c['type'] == 'GOLDEN_CROSS':
+                                golden_crosses.append(enriched)
+                                golden_seqs.append(seq)
+                            else:
+                                death_crosses.append(enriched)
+                                death_seqs.append(seq)
                     
                     processed_symbols += 1
                     
@@ -73,16 +111,18 @@ class handler(BaseHTTPRequestHandler):
                     # Continue with other symbols if one fails
                     continue
             
-            # Sort crossovers by timestamp (most recent first)
-            all_crossovers.sort(key=lambda x: x['timestamp'], reverse=True)
-            
-            # Separate by type
-            golden_crosses = [c for c in all_crossovers if c['type'] == 'GOLDEN_CROSS']
-            death_crosses = [c for c in all_crossovers if c['type'] == 'DEATH_CROSS']
+            # Sort each type by timestamp (most recent first), then merge for the combined list;
+            # equal timestamps fall back to collection order, as one stable sort over everything would
+            golden_crosses, golden_keys = _most_recent_first(golden_crosses, golden_seqs)
+            death_crosses, death_keys = _most_recent_first(death_crosses, death_seqs)
+            all_crossovers = [
+                c for _, c in merge(zip(golden_keys, golden_crosses), zip(death_keys, death_crosses),
+                                    key=itemgetter(0))
+            ]
             
             response_data = {
                 'success': True,
-                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                'timestamp': timestamp,
                 'processing_info': {
                     'symbols_requested': count,
                     'symbols_processed': processed_symbols,
@@ -101,16 +141,19 @@ class handler(BaseHTTPRequestHandler):
                 }
             }
             
+            # Serialize before any status is sent, so a failure here still gets a clean 500
+            chunks = self._serialize_chunks(response_data)
+            
             # Set response headers
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+            self._cors()
             self.send_header('Cache-Control', 'public, max-age=600')  # 10 minutes cache
+            self.send_header('Transfer-Encoding', 'chunked')  # HTTP/1.1 (see JSONResponseMixin)
             self.end_headers()
             
-            # Send response
-            self.wfile.write(json.dumps(response_data, indent=2).encode())
+            # Stream response
+            self._stream_response(chunks)
             
         except ValueError as e:
             # Client error
@@ -120,12 +163,7 @@ class handler(BaseHTTPRequestHandler):
                 'message': 'Invalid request parameters'
             }
             
-            self.send_response(400)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            self.wfile.write(json.dumps(error_response, indent=2).encode())
+            self._send_json(400, error_response)
             
         except Exception as e:
             # Server error
@@ -135,17 +173,33 @@ class handler(BaseHTTPRequestHandler):
                 'message': 'Failed to detect crossovers'
             }
             
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            self.wfile.write(json.dumps(error_response, indent=2).encode())
+            self._send_json(500, error_response)
+    
+    def _serialize_chunks(self, response_data: dict) -> List[bytes]:
+        """Serialize the response as body chunks: the envelope, then one chunk per crossover list"""
+        crossovers = response_data.pop('crossovers')
+        
+        # Everything except the crossover lists, with the closing brace left open
+        chunks = [orjson.dumps(response_data)[:-1] + b',"crossovers":{']
+        for i, (name, items) in enumerate(crossovers.items()):
+            chunks.append(
+                (b',' if i else b'') + orjson.dumps(name) + b':[' + b','.join(map(orjson.dumps, items)) + b']'
+            )
+        chunks.append(b'}}')
+        return chunks
+    
+    def _stream_response(self, chunks: List[bytes]):
+        """Write the chunked body and its terminator in a single write (wfile is unbuffered)"""
+        body = b''.join(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n" for chunk in chunks)
+        try:
+            self.wfile.write(body + b"0\r\n\r\n")
+        except Exception:
+            # The 200 is already out: never start a second response inside the body, drop the connection
+            self.close_connection = True
     
     def do_OPTIONS(self):
         # Handle CORS preflight
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self._cors()
+        self.send_header('Content-Length', '0')
         self.end_headers()
\ No newline at end of file
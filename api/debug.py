@@ -1,187 +1,250 @@
 """
 Diagnostic API endpoint for Vercel - Tests Binance API connection
 GET /api/test-binance - Comprehensive tests for debugging production issues
+GET /api/test-binance?verbose=1 - Also includes environment debug info
 """
 
 from http.server import BaseHTTPRequestHandler
-import json
+import orjson
 import sys
 import os
-import requests
+from urllib.parse import parse_qs, urlparse
 from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add utils to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
 from binance_client import BinanceClient
+from http_utils import JSONResponseMixin, qparam
 
-class handler(BaseHTTPRequestHandler):
+# Shared across warm invocations of this function
+client = BinanceClient()
+
+# Direct probes reuse the client's keep-alive pool, so all six probes share TLS connections
+session = client.session
+
+
+def _test_ping(session):
+    """Direct ping to Binance API"""
+    print("Testing Binance API ping...")
+    try:
+        response = session.get('https://api.binance.com/api/v3/ping', timeout=8)
+        result = {
+            'status': 'success' if response.status_code == 200 else 'failed',
+            'status_code': response.status_code,
+            'response_time': response.elapsed.total_seconds(),
+            'response': response.json() if response.status_code == 200 else None
+        }
+        print(f"Ping result: {response.status_code}")
+    except Exception as e:
+        result = {
+            'status': 'error',
+            'error': str(e),
+            'error_type': type(e).__name__
+        }
+        print(f"Ping error: {str(e)}")
+    
+    return 'ping', result
+
+
+def _test_server_time(session):
+    """Server time test"""
+    print("Testing Binance server time...")
+    try:
+        response = session.get('https://api.binance.com/api/v3/time', timeout=8)
+        if response.status_code == 200:
+            server_data = response.json()
+            result = {
+                'status': 'success',
+                'server_timestamp': server_data['serverTime'],
+                'response_time': response.elapsed.total_seconds()
+            }
+            print(f"Server time: {server_data['serverTime']}")
+        else:
+            result = {
+                'status': 'failed',
+                'status_code': response.status_code
+            }
+    except Exception as e:
+        result = {
+            'status': 'error',
+            'error': str(e),
+            'error_type': type(e).__name__
+        }
+        print(f"Server time error: {str(e)}")
+    
+    return 'server_time', result
+
+
+def _test_single_ticker(session):
+    """Single ticker test (BTCUSDT)"""
+    print("Testing single ticker...")
+    try:
+        # One-symbol query: the full 24hr list is already fetched (and cached) by _test_full_ticker_stats
+        response = session.get('https://api.binance.com/api/v3/ticker/24hr', params={'symbol': 'BTCUSDT'}, timeout=8)
+        if response.status_code == 200:
+            ticker_data = response.json()
+            if ticker_data.get('symbol') == 'BTCUSDT':
+                result = {
+                    'status': 'success',
+                    'symbol': ticker_data['symbol'],
+                    'price': float(ticker_data['lastPrice']),
+                    'change_percent': float(ticker_data['priceChangePercent']),
+                    'volume': float(ticker_data['volume']),
+                    'quote_volume': float(ticker_data['quoteVolume']),
+                    'response_time': response.elapsed.total_seconds()
+                }
+                print(f"BTCUSDT price: {ticker_data['lastPrice']}")
+            else:
+                result = {
+                    'status': 'failed',
+                    'error': 'BTCUSDT not found in ticker response'
+                }
+        else:
+            result = {
+                'status': 'failed',
+                'status_code': response.status_code
+            }
+    except Exception as e:
+        result = {
+            'status': 'error',
+            'error': str(e),
+            'error_type': type(e).__name__
+        }
+        print(f"Single ticker error: {str(e)}")
+    
+    return 'single_ticker', result
+
+
+def _test_client_connection(session):
+    """Client connection test"""
+    print("Testing BinanceClient connection...")
+    try:
+        connection_test = client.test_connection()
+        result = {
+            'status': 'success' if connection_test else 'failed',
+            'result': connection_test
+        }
+        print(f"Client connection: {connection_test}")
+    except Exception as e:
+        result = {
+            'status': 'error',
+            'error': str(e),
+            'error_type': type(e).__name__
+        }
+        print(f"Client connection error: {str(e)}")
+    
+    return 'client_connection', result
+
+
+def _test_full_ticker_stats(session):
+    """Full ticker stats test (what top100 uses)"""
+    print("Testing full ticker stats...")
+    try:
+        tickers = client.get_24hr_ticker_stats()
+        if tickers and len(tickers) > 0:
+            usdt_tickers = [t for t in tickers if t['symbol'].endswith('USDT')]
+            result = {
+                'status': 'success',
+                'total_symbols': len(tickers),
+                'usdt_symbols': len(usdt_tickers),
+                'sample_ticker': tickers[0] if tickers else None
+            }
+            print(f"Full ticker stats: {len(tickers)} total, {len(usdt_tickers)} USDT")
+        else:
+            result = {
+                'status': 'failed',
+                'error': 'No data returned'
+            }
+    except Exception as e:
+        result = {
+            'status': 'error',
+            'error': str(e),
+            'error_type': type(e).__name__
+        }
+        print(f"Full ticker stats error: {str(e)}")
+    
+    return 'full_ticker_stats', result
+
+
+def _test_top_symbols(session):
+    """Top symbols method (the actual failing method)"""
+    print("Testing get_top_symbols_by_volume...")
+    try:
+        top_symbols = client.get_top_symbols_by_volume(5)  # Small count for test
+        if top_symbols and len(top_symbols) > 0:
+            # Check if it's mock data (mock BTC price is 50000)
+            is_mock_data = top_symbols[0]['price'] == 50000.0
+            result = {
+                'status': 'success',
+                'count': len(top_symbols),
+                'is_mock_data': is_mock_data,
+                'sample_data': top_symbols[0],
+                'all_symbols': [s['symbol'] for s in top_symbols]
+            }
+            print(f"Top symbols: {len(top_symbols)} returned, mock: {is_mock_data}")
+        else:
+            result = {
+                'status': 'failed',
+                'error': 'No symbols returned'
+            }
+    except Exception as e:
+        result = {
+            'status': 'error',
+            'error': str(e),
+            'error_type': type(e).__name__
+        }
+        print(f"Top symbols error: {str(e)}")
+    
+    return 'top_symbols', result
+
+
+# Independent diagnostics (each returns its results key and payload)
+PROBES = [
+    _test_ping,
+    _test_server_time,
+    _test_single_ticker,
+    _test_client_connection,
+    _test_full_ticker_stats,
+    _test_top_symbols
+]
+
+# Worker threads stay alive across warm invocations
+probe_executor = ThreadPoolExecutor(max_workers=len(PROBES))
+
+class handler(JSONResponseMixin, BaseHTTPRequestHandler):
     def do_GET(self):
         try:
-            # Initialize client
-            client = BinanceClient()
+            # ?verbose=1 includes the (large) environment dump
+            query_params = parse_qs(urlparse(self.path).query)
+            verbose = qparam(query_params, 'verbose', '0', cast=str) == '1'
             
             # Test results container
             test_results = {
                 'timestamp': datetime.now().isoformat(),
                 'environment': 'vercel_production',
-                'tests': {},
-                'debug_info': {}
+                'tests': {}
             }
             
-            # Test 1: Direct ping to Binance API
-            print("Testing Binance API ping...")
-            try:
-                response = requests.get('https://api.binance.com/api/v3/ping', timeout=8)
-                test_results['tests']['ping'] = {
-                    'status': 'success' if response.status_code == 200 else 'failed',
-                    'status_code': response.status_code,
-                    'response_time': response.elapsed.total_seconds(),
-                    'response': response.json() if response.status_code == 200 else None
-                }
-                print(f"Ping result: {response.status_code}")
-            except Exception as e:
-                test_results['tests']['ping'] = {
-                    'status': 'error',
-                    'error': str(e),
-                    'error_type': type(e).__name__
-                }
-                print(f"Ping error: {str(e)}")
-            
-            # Test 2: Server time test
-            print("Testing Binance server time...")
-            try:
-                response = requests.get('https://api.binance.com/api/v3/time', timeout=8)
-                if response.status_code == 200:
-                    server_data = response.json()
-                    test_results['tests']['server_time'] = {
-                        'status': 'success',
-                        'server_timestamp': server_data['serverTime'],
-                        'response_time': response.elapsed.total_seconds()
-                    }
-                    print(f"Server time: {server_data['serverTime']}")
-                else:
-                    test_results['tests']['server_time'] = {
-                        'status': 'failed',
-                        'status_code': response.status_code
-                    }
-            except Exception as e:
-                test_results['tests']['server_time'] = {
-                    'status': 'error',
-                    'error': str(e),
-                    'error_type': type(e).__name__
-                }
-                print(f"Server time error: {str(e)}")
-            
-            # Test 3: Single ticker test (BTCUSDT)
-            print("Testing single ticker...")
-            try:
-                response = requests.get('https://api.binance.com/api/v3/ticker/24hr?symbol=BTCUSDT', timeout=8)
-                if response.status_code == 200:
-                    ticker_data = response.json()
-                    test_results['tests']['single_ticker'] = {
-                        'status': 'success',
-                        'symbol': ticker_data['symbol'],
-                        'price': float(ticker_data['lastPrice']),
-                        'change_percent': float(ticker_data['priceChangePercent']),
-                        'volume': float(ticker_data['volume']),
-                        'quote_volume': float(ticker_data['quoteVolume']),
-                        'response_time': response.elapsed.total_seconds()
-                    }
-                    print(f"BTCUSDT price: {ticker_data['lastPrice']}")
-                else:
-                    test_results['tests']['single_ticker'] = {
-                        'status': 'failed',
-                        'status_code': response.status_code
-                    }
-            except Exception as e:
-                test_results['tests']['single_ticker'] = {
-                    'status': 'error',
-                    'error': str(e),
-                    'error_type': type(e).__name__
-                }
-                print(f"Single ticker error: {str(e)}")
-            
-            # Test 4: Client connection test
-            print("Testing BinanceClient connection...")
-            try:
-                connection_test = client.test_connection()
-                test_results['tests']['client_connection'] = {
-                    'status': 'success' if connection_test else 'failed',
-                    'result': connection_test
-                }
-                print(f"Client connection: {connection_test}")
-            except Exception as e:
-                test_results['tests']['client_connection'] = {
-                    'status': 'error',
-                    'error': str(e),
-                    'error_type': type(e).__name__
-                }
-                print(f"Client connection error: {str(e)}")
-            
-            # Test 5: Full ticker stats test (what top100 uses)
-            print("Testing full ticker stats...")
-            try:
-                tickers = client.get_24hr_ticker_stats()
-                if tickers and len(tickers) > 0:
-                    usdt_tickers = [t for t in tickers if t['symbol'].endswith('USDT')]
-                    test_results['tests']['full_ticker_stats'] = {
-                        'status': 'success',
-                        'total_symbols': len(tickers),
-                        'usdt_symbols': len(usdt_tickers),
-                        'sample_ticker': tickers[0] if tickers else None
-                    }
-                    print(f"Full ticker stats: {len(tickers)} total, {len(usdt_tickers)} USDT")
-                else:
-                    test_results['tests']['full_ticker_stats'] = {
-                        'status': 'failed',
-                        'error': 'No data returned'
-                    }
-            except Exception as e:
-                test_results['tests']['full_ticker_stats'] = {
-                    'status': 'error',
-                    'error': str(e),
-                    'error_type': type(e).__name__
-                }
-                print(f"Full ticker stats error: {str(e)}")
-            
-            # Test 6: Top symbols method (the actual failing method)
-            print("Testing get_top_symbols_by_volume...")
-            try:
-                top_symbols = client.get_top_symbols_by_volume(5)  # Small count for test
-                if top_symbols and len(top_symbols) > 0:
-                    # Check if it's mock data (mock BTC price is 50000)
-                    is_mock_data = top_symbols[0]['price'] == 50000.0
-                    test_results['tests']['top_symbols'] = {
-                        'status': 'success',
-                        'count': len(top_symbols),
-                        'is_mock_data': is_mock_data,
-                        'sample_data': top_symbols[0],
-                        'all_symbols': [s['symbol'] for s in top_symbols]
-                    }
-                    print(f"Top symbols: {len(top_symbols)} returned, mock: {is_mock_data}")
-                else:
-                    test_results['tests']['top_symbols'] = {
-                        'status': 'failed',
-                        'error': 'No symbols returned'
-                    }
-            except Exception as e:
-                test_results['tests']['top_symbols'] = {
-                    'status': 'error',
-                    'error': str(e),
-                    'error_type': type(e).__name__
-                }
-                print(f"Top symbols error: {str(e)}")
+            # Run the independent probes concurrently (wall time ~ slowest probe)
+            probe_start = time.time()
+            for key, result in probe_executor.map(lambda probe: probe(session), PROBES):
+                test_results['tests'][key] = result
+            test_results['probe_time_seconds'] = round(time.time() - probe_start, 3)
+            client.persist_cache()
             
             # Add environment debug info
-            test_results['debug_info'] = {
-                'python_path': sys.path,
-                'working_directory': os.getcwd(),
-                'environment_vars': {
-                    'PATH': os.environ.get('PATH', 'Not set'),
-                    'PYTHONPATH': os.environ.get('PYTHONPATH', 'Not set')
+            if verbose:
+                test_results['debug_info'] = {
+                    'python_path': sys.path,
+                    'working_directory': os.getcwd(),
+                    'environment_vars': {
+                        'PATH': os.environ.get('PATH', 'Not set'),
+                        'PYTHONPATH': os.environ.get('PYTHONPATH', 'Not set')
+                    }
                 }
-            }
             
             # Determine overall status
             success_count = sum(1 for test in test_results['tests'].values() if test.get('status') == 'success')
@@ -198,14 +261,8 @@ class handler(BaseHTTPRequestHandler):
                 'test_results': test_results
             }
             
-            # Set response headers
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            # Send response
-            self.wfile.write(json.dumps(response_data, indent=2).encode('utf-8'))
+            # Send response (serialized before the status line goes out)
+            self._send_json(200, response_data, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY)
             
         except Exception as e:
             # Error response
@@ -216,17 +273,11 @@ class handler(BaseHTTPRequestHandler):
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            self.wfile.write(json.dumps(error_response).encode('utf-8'))
+            self._send_json(500, error_response)
 
     def do_OPTIONS(self):
         # Handle preflight requests
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self._cors()
+        self.send_header('Content-Length', '0')
         self.end_headers()
@@ -4,10 +4,12 @@ GET /api/market-summary - Returns overall market analysis summary
 """
 
 from http.server import BaseHTTPRequestHandler
-import json
 import sys
 import os
 from urllib.parse import parse_qs, urlparse
+from heapq import nlargest, nsmallest
+from operator import itemgetter
+from datetime import datetime
 import time
 
 # Add utils to path
@@ -15,74 +17,99 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
 from binance_client import BinanceClient
 from technical import TechnicalAnalysis
+from http_utils import JSONResponseMixin, qparam
 
-class handler(BaseHTTPRequestHandler):
+# Shared across warm invocations of this function
+binance_client = BinanceClient()
+tech_analysis = TechnicalAnalysis()
+
+# Concurrent kline fetches (Vercel has 10-second limit)
+FETCH_WORKERS = 16
+FETCH_TIMEOUT_SECONDS = 7.5
+
+class handler(JSONResponseMixin, BaseHTTPRequestHandler):
     def do_GET(self):
         try:
             # Parse query parameters
             parsed_url = urlparse(self.path)
             query_params = parse_qs(parsed_url.query)
             
-            count = int(query_params.get('count', [25])[0])  # Smaller sample for summary
-            count = min(count, 50)  # Max 50 symbols for summary
-            days = int(query_params.get('days', [60])[0])
-            days = min(days, 100)
-            
-            # Initialize clients
-            binance_client = BinanceClient()
-            tech_analysis = TechnicalAnalysis()
+            count = qparam(query_params, 'count', 25, cap=50)  # Smaller sample for summary
+            days = qparam(query_params, 'days', 60, cap=100)
             
             start_time = time.time()
+            ts = datetime.now().isoformat()  # One timestamp for the whole request
             
             # Get top symbols
             top_symbols_data = binance_client.get_top_symbols_by_volume(count)
             
             # Analyze symbols
             symbols_analysis = []
+            analysed_symbols = []  # top_symbols_data rows actually analysed, in rank order
             processed_count = 0
             
+            # Fetch historical data for all symbols concurrently within the remaining budget
+            remaining = max(FETCH_TIMEOUT_SECONDS - (time.time() - start_time), 0)
+            klines = binance_client.get_many_historical_klines(
+                [s['symbol'] for s in top_symbols_data], '1d', days,
+                timeout=remaining, max_workers=FETCH_WORKERS
+            )
+            binance_client.persist_cache()
+            
+            # Analyze symbols in rank order (skipping timed-out fetches)
             for symbol_data in top_symbols_data:
                 symbol = symbol_data['symbol']
-                
-                # Timeout protection
-                if time.time() - start_time > 8:
-                    break
+                df = klines.get(symbol)
+                if df is None:
+                    continue
                 
                 try:
-                    # Get historical data
-                    df = binance_client.get_historical_klines(symbol, '1d', days)
-                    
                     if not df.empty:
                         # Calculate analysis
-                        ma_analysis = tech_analysis.calculate_all_ma(df, symbol)
-                        crossovers = tech_analysis.detect_crossovers(df, symbol)
+                        ma_analysis, crossovers = tech_analysis.calculate_all_ma_and_crossovers(df, symbol, ts=ts)
                         
+                        golden_count = sum(1 for c in crossovers if c['type'] == 'GOLDEN_CROSS')
+                        mas = ma_analysis.get('moving_averages', {})
+                        
+                        # Flat row consumed by get_market_summary
                         symbol_analysis = {
                             'symbol': symbol,
                             'rank': symbol_data['rank'],
                             'price': symbol_data['price'],
                             'change_24h': symbol_data['change_24h'],
                             'volume_24h': symbol_data['quote_volume_24h'],
-                            'moving_averages': ma_analysis.get('moving_averages', {}),
-                            'crossovers': crossovers
+                            'price_vs_ma20': mas.get('ma_20', {}).get('price_vs_sma'),
+                            'price_vs_ma50': mas.get('ma_50', {}).get('price_vs_sma'),
+                            'price_vs_ma200': mas.get('ma_200', {}).get('price_vs_sma'),
+                            'golden_cross_count': golden_count,
+                            'death_cross_count': len(crossovers) - golden_count
                         }
                         symbols_analysis.append(symbol_analysis)
+                        analysed_symbols.append(symbol_data)
                         processed_count += 1
                 
                 except Exception:
                     continue
             
             # Generate market summary
-            market_summary = tech_analysis.get_market_summary(symbols_analysis)
+            market_summary = tech_analysis.get_market_summary(symbols_analysis, ts=ts)
             
-            # Additional statistics
-            total_volume_24h = sum(s['volume_24h'] for s in top_symbols_data[:processed_count])
-            avg_change_24h = sum(s['change_24h'] for s in top_symbols_data[:processed_count]) / max(processed_count, 1)
+            # Additional statistics over the analysed symbols only (timed-out or failed
+            # fetches can sit anywhere in the rank order, so this is not a prefix)
+            total_volume_24h = 0.0
+            total_change_24h = 0.0
+            for s in analysed_symbols:
+                total_volume_24h += s['volume_24h']
+                total_change_24h += s['change_24h']
+            avg_change_24h = total_change_24h / max(processed_count, 1)
             
             # Top gainers and losers
-            sorted_by_change = sorted(top_symbols_data[:processed_count], key=lambda x: x['change_24h'])
-            top_gainers = sorted_by_change[-5:][::-1]  # Top 5 gainers
-            top_losers = sorted_by_change[:5]  # Top 5 losers
+            by_change = itemgetter('change_24h')
+            top_gainers = nlargest(5, analysed_symbols, key=by_change)  # Top 5 gainers
+            top_losers = nsmallest(5, analysed_symbols, key=by_change)  # Top 5 losers
+            
+            # Symbols above each SMA (already counted by the market summary)
+            above_ma_counts = market_summary.get('above_ma_counts', {})
             
             response_data = {
                 'success': True,
@@ -121,26 +148,15 @@ class handler(BaseHTTPRequestHandler):
                     ]
                 },
                 'technical_summary': {
-                    'symbols_above_ma20': sum(1 for s in symbols_analysis 
-                                            if s.get('moving_averages', {}).get('ma_20', {}).get('price_vs_sma') == 'above'),
-                    'symbols_above_ma50': sum(1 for s in symbols_analysis 
-                                            if s.get('moving_averages', {}).get('ma_50', {}).get('price_vs_sma') == 'above'),
-                    'symbols_above_ma200': sum(1 for s in symbols_analysis 
-                                             if s.get('moving_averages', {}).get('ma_200', {}).get('price_vs_sma') == 'above'),
+                    'symbols_above_ma20': above_ma_counts.get('ma20', 0),
+                    'symbols_above_ma50': above_ma_counts.get('ma50', 0),
+                    'symbols_above_ma200': above_ma_counts.get('ma200', 0),
                     'total_symbols': len(symbols_analysis)
                 }
             }
             
-            # Set response headers
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-            self.send_header('Cache-Control', 'public, max-age=900')  # 15 minutes cache
-            self.end_headers()
-            
-            # Send response
-            self.wfile.write(json.dumps(response_data, indent=2).encode())
+            # Send response (serialized before the status line goes out)
+            self._send_json(200, response_data, cache_control='public, max-age=900')  # 15 minutes cache
             
         except ValueError as e:
             # Client error
@@ -150,12 +166,7 @@ class handler(BaseHTTPRequestHandler):
                 'message': 'Invalid request parameters'
             }
             
-            self.send_response(400)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            self.wfile.write(json.dumps(error_response, indent=2).encode())
+            self._send_json(400, error_response)
             
         except Exception as e:
             # Server error
@@ -165,17 +176,11 @@ class handler(BaseHTTPRequestHandler):
                 'message': 'Failed to generate market summary'
             }
             
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            self.wfile.write(json.dumps(error_response, indent=2).encode())
+            self._send_json(500, error_response)
     
     def do_OPTIONS(self):
         # Handle CORS preflight
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self._cors()
+        self.send_header('Content-Length', '0')
         self.end_headers()
\ No newline at end of file
@@ -4,37 +4,31 @@ GET /api/top100 - Returns top 100 cryptocurrencies by trading volume
 """
 
 from http.server import BaseHTTPRequestHandler
-import json
 import sys
 import os
 from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
 
 # Add utils to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
 from binance_client import BinanceClient
+from http_utils import JSONResponseMixin, qparam
 
-class handler(BaseHTTPRequestHandler):
+# Shared across warm invocations of this function
+client = BinanceClient()
+
+class handler(JSONResponseMixin, BaseHTTPRequestHandler):
     def do_GET(self):
         try:
-            # Initialize client
-            client = BinanceClient()
-            
             # Parse query parameters
-            query_params = {}
-            if self.path.find('?') != -1:
-                query_string = self.path.split('?')[1]
-                for param in query_string.split('&'):
-                    if '=' in param:
-                        key, value = param.split('=', 1)
-                        query_params[key] = value
-            
-            # Get parameters
-            count = int(query_params.get('count', 100))
-            count = min(count, 200)  # Limit to prevent timeouts
+            query_params = parse_qs(urlsplit(self.path).query)
+            count = qparam(query_params, 'count', 100, cap=200)  # Limit to prevent timeouts
             
             # Fetch top symbols
+            cached = client.is_cached('ticker/24hr')
             top_symbols = client.get_top_symbols_by_volume(count)
+            client.persist_cache()
             
             response_data = {
                 'success': True,
@@ -42,21 +36,13 @@ class handler(BaseHTTPRequestHandler):
                 'count': len(top_symbols),
                 'data': top_symbols,
                 'cache_info': {
-                    'cached': len(top_symbols) > 0,
-                    'cache_duration_seconds': client.cache_duration
+                    'cached': cached,
+                    'cache_duration_seconds': client.ticker_cache_duration  # TTL of the ticker/24hr entry checked above
                 }
             }
             
-            # Set response headers
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-            self.send_header('Cache-Control', 'public, max-age=300')  # 5 minutes cache
-            self.end_headers()
-            
-            # Send response
-            self.wfile.write(json.dumps(response_data, indent=2).encode())
+            # Send response (serialized before the status line goes out)
+            self._send_json(200, response_data, cache_control='public, max-age=300')  # 5 minutes cache
             
         except Exception as e:
             # Error response
@@ -66,17 +52,11 @@ class handler(BaseHTTPRequestHandler):
                 'message': 'Failed to fetch cryptocurrency data'
             }
             
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            self.wfile.write(json.dumps(error_response, indent=2).encode())
+            self._send_json(500, error_response)
     
     def do_OPTIONS(self):
         # Handle CORS preflight
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self._cors()
+        self.send_header('Content-Length', '0')
         self.end_headers()
\ No newline at end of file
@@ -1,15 +1,25 @@
 # Adapted Binance API Client for Vercel serverless functions
 import time
 import requests
-import pandas as pd
-from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+import numpy as np
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait
 import json
 import os
+import tempfile
 
-# Simple caching mechanism for serverless environment
-_cache = {}
-_cache_timeout = {}
+if TYPE_CHECKING:
+    import pandas as pd  # Imported lazily: top100 never needs it and it dominates cold start
+
+from cache import TTLCache
+
+# Kline row positions of the numeric columns kept in the DataFrame
+KLINE_PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'quote_asset_volume']
+KLINE_PRICE_FIELDS = [1, 2, 3, 4, 5, 7]
+
+# Simple caching mechanism for serverless environment (snapshotted to /tmp for cold starts)
+_cache = TTLCache(maxsize=256, persist_path=os.path.join(tempfile.gettempdir(), 'binance_cache.json'))
 
 class BinanceClient:
     """Simplified Binance API client for serverless environment"""
@@ -17,6 +27,12 @@ class BinanceClient:
     def __init__(self):
         self.base_url = "https://api.binance.com/api/v3"
         self.cache_duration = 300  # 5 minutes cache
+        self.ticker_cache_duration = 60  # 24hr stats change quickly
+        
+        # Keep-alive connection pool sized for concurrent kline fetches
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=20, pool_maxsize=20))
+        self.session.headers.update({'Connection': 'keep-alive', 'Accept-Encoding': 'gzip'})
         
     def _get_cache_key(self, endpoint: str, params: dict = None) -> str:
         """Generate cache key for request"""
@@ -25,80 +41,78 @@ class BinanceClient:
             key += "_" + "_".join(f"{k}_{v}" for k, v in sorted(params.items()))
         return key
     
-    def _is_cache_valid(self, key: str) -> bool:
-        """Check if cache entry is still valid"""
-        if key not in _cache:
-            return False
-        return time.time() - _cache_timeout.get(key, 0) < self.cache_duration
-    
-    def _set_cache(self, key: str, data: Any):
-        """Store data in cache"""
-        _cache[key] = data
-        _cache_timeout[key] = time.time()
-    
-    def _get_cache(self, key: str) -> Any:
-        """Get data from cache"""
-        return _cache.get(key)
-    
-    def _make_request(self, endpoint: str, params: dict = None) -> dict:
+    def _make_request(self, endpoint: str, params: dict = None, 
+                     cache_key: str = None, ttl: float = None) -> dict:
         """Make API request with caching"""
-        cache_key = self._get_cache_key(endpoint, params)
+        cache_key = cache_key or self._get_cache_key(endpoint, params)
         
         # Check cache first
-        if self._is_cache_valid(cache_key):
-            return self._get_cache(cache_key)
+        data = _cache.get(cache_key)
+        if data is not None:
+            return data
         
         # Make API request
         try:
             url = f"{self.base_url}/{endpoint}"
-            response = requests.get(url, params=params, timeout=8)
+            response = self.session.get(url, params=params, timeout=8)
             response.raise_for_status()
             data = response.json()
             
             # Cache the response
-            self._set_cache(cache_key, data)
+            _cache.set(cache_key, data, ttl or self.cache_duration)
             return data
             
         except Exception as e:
             # If API fails, try to return cached data even if expired
-            if cache_key in _cache:
-                return self._get_cache(cache_key)
+            data = _cache.get_stale(cache_key)
+            if data is not None:
+                return data
             raise e
     
+    def persist_cache(self):
+        """Snapshot the response cache for the next cold start (call once the fetches are done)"""
+        _cache.flush()
+    
+    def is_cached(self, endpoint: str, params: dict = None) -> bool:
+        """Check whether a fresh response for this request is cached"""
+        return self._get_cache_key(endpoint, params) in _cache
+    
     def get_24hr_ticker_stats(self) -> List[Dict[str, Any]]:
         """Get 24hr ticker statistics for all symbols"""
-        return self._make_request("ticker/24hr")
+        return self._make_request("ticker/24hr", ttl=self.ticker_cache_duration)
     
     def get_top_symbols_by_volume(self, count: int = 100) -> List[Dict[str, Any]]:
         """Get top symbols by 24hr volume in USDT"""
         try:
             tickers = self.get_24hr_ticker_stats()
             
-            # Filter USDT pairs and sort by volume
-            usdt_tickers = [
-                ticker for ticker in tickers 
-                if ticker['symbol'].endswith('USDT') and 
-                float(ticker['quoteVolume']) > 0
-            ]
+            # Filter USDT pairs with volume (a plain str.endswith pass is cheaper than
+            # building a numpy string array for np.char.endswith on ~2500 tickers)
+            usdt_tickers = [ticker for ticker in tickers if ticker['symbol'].endswith('USDT')]
+            quote_volume = np.array([t['quoteVolume'] for t in usdt_tickers], dtype=np.float64)
+            candidates = np.flatnonzero(quote_volume > 0)
             
-            # Sort by quote volume (USDT volume)
-            usdt_tickers.sort(key=lambda x: float(x['quoteVolume']), reverse=True)
+            # Select the top `count` by quote volume (USDT volume), then order just those
+            if count < len(candidates):
+                candidates = candidates[np.argpartition(-quote_volume[candidates], count)[:count]]
+            top_idx = candidates[np.argsort(-quote_volume[candidates], kind='stable')]
             
             # Return top symbols with additional info
-            top_symbols = []
-            for i, ticker in enumerate(usdt_tickers[:count]):
-                symbol_data = {
-                    'rank': i + 1,
+            _f = float
+            top_symbols = [
+                {
+                    'rank': rank,
                     'symbol': ticker['symbol'],
-                    'price': float(ticker['lastPrice']),
-                    'change_24h': float(ticker['priceChangePercent']),
-                    'volume_24h': float(ticker['volume']),
-                    'quote_volume_24h': float(ticker['quoteVolume']),
-                    'high_24h': float(ticker['highPrice']),
-                    'low_24h': float(ticker['lowPrice']),
+                    'price': _f(ticker['lastPrice']),
+                    'change_24h': _f(ticker['priceChangePercent']),
+                    'volume_24h': _f(ticker['volume']),
+                    'quote_volume_24h': _f(ticker['quoteVolume']),
+                    'high_24h': _f(ticker['highPrice']),
+                    'low_24h': _f(ticker['lowPrice']),
                     'count': int(ticker['count'])
                 }
-                top_symbols.append(symbol_data)
+                for rank, ticker in enumerate((usdt_tickers[idx] for idx in top_idx.tolist()), 1)
+            ]
             
             return top_symbols
             
@@ -109,47 +123,70 @@ class BinanceClient:
             # Return mock data as fallback
             return self._get_mock_top_symbols(count)
     
-    def get_historical_klines(self, symbol: str, interval: str = '1d', days_back: int = 100) -> pd.DataFrame:
+    def get_historical_klines(self, symbol: str, interval: str = '1d', days_back: int = 100) -> 'pd.DataFrame':
         """Get historical kline/candlestick data for a symbol"""
+        import pandas as pd
+        
         try:
-            # Calculate start time
-            end_time = datetime.now()
-            start_time = end_time - timedelta(days=days_back)
-            start_timestamp = int(start_time.timestamp() * 1000)
+            # Calculate start time (epoch ms)
+            start_ms = int(time.time() * 1000) - days_back * 86_400_000
             
             params = {
                 'symbol': symbol,
                 'interval': interval,
-                'startTime': start_timestamp,
+                'startTime': start_ms,
                 'limit': min(days_back + 10, 1000)  # API limit
             }
             
-            klines = self._make_request("klines", params)
+            # startTime moves every call, so key the cache on the request shape instead
+            klines = self._make_request(
+                "klines", params,
+                cache_key=f"kl:{symbol}:{interval}:{days_back}",
+                ttl=self.cache_duration
+            )
             
             if not klines:
                 return pd.DataFrame()
             
-            # Convert to DataFrame
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
+            # Slice the raw kline rows once with numpy instead of coercing DataFrame columns
+            arr = np.array(klines, dtype=object)
+            timestamps = arr[:, 0].astype(np.int64).view('datetime64[ms]')
+            values = arr[:, KLINE_PRICE_FIELDS].astype(np.float64)
             
-            # Convert timestamp to datetime
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-            
-            # Convert price columns to float
-            price_columns = ['open', 'high', 'low', 'close', 'volume', 'quote_asset_volume']
-            for col in price_columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+            df = pd.DataFrame(
+                values,
+                index=pd.DatetimeIndex(timestamps, name='timestamp'),
+                columns=KLINE_PRICE_COLUMNS
+            )
             
             return df
             
         except Exception:
             return pd.DataFrame()
     
+    def get_many_historical_klines(self, symbols: List[str], interval: str = '1d', days_back: int = 100,
+                                   timeout: Optional[float] = None,
+                                   max_workers: int = 16) -> Dict[str, 'pd.DataFrame']:
+        """Fetch klines for many symbols concurrently.
+        
+        Returns {symbol: DataFrame} in input order for the fetches that finished
+        within timeout seconds; stragglers are dropped rather than waited on.
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {
+            executor.submit(self.get_historical_klines, symbol, interval, days_back): symbol
+            for symbol in symbols
+        }
+        done, _ = wait(futures, timeout=timeout)
+        # Don't wait for stragglers past the time budget
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        return {
+            symbol: future.result()
+            for future, symbol in futures.items()
+            if future in done and future.exception() is None
+        }
+    
     def _get_mock_top_symbols(self, count: int) -> List[Dict[str, Any]]:
         """Generate mock data for testing"""
         mock_symbols = [
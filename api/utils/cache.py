@@ -0,0 +1,153 @@
+# In-memory TTL cache shared across warm Vercel invocations
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the snapshot layout changes; other versions are ignored
+SNAPSHOT_VERSION = 1
+
+
+class TTLCache:
+    """Process-wide LRU cache with a per-entry time-to-live.
+    
+    If persist_path is set, flush() snapshots the entries to that file as JSON
+    and the first use in a new process reloads it, so a cold start in the same
+    container can pick up where the previous process left off. Values must be
+    JSON-serializable (raw API responses).
+    """
+    
+    def __init__(self, maxsize: int = 256, persist_path: Optional[str] = None,
+                 persist_max_age: float = 300):
+        self.maxsize = maxsize
+        self.persist_path = persist_path
+        self.persist_max_age = persist_max_age
+        self._data: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._loaded = persist_path is None
+        self._dirty = False
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a cached value, or default if missing or expired"""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._data.get(key)
+            if entry is None or time.monotonic() >= entry[0]:
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+    
+    def get_stale(self, key: str, default: Any = None) -> Any:
+        """Get a cached value even if it has expired (used as API-failure fallback)"""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._data.get(key)
+            return entry[1] if entry is not None else default
+    
+    def set(self, key: str, value: Any, ttl: float):
+        """Store a value that expires after ttl seconds, evicting the least recently used"""
+        with self._lock:
+            self._ensure_loaded()
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            self._dirty = True
+    
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._data.get(key)
+            return entry is not None and time.monotonic() < entry[0]
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def flush(self):
+        """Write the cache to persist_path atomically if it changed since the last flush.
+        
+        Called synchronously by the handlers once their data is fetched: a serverless
+        instance may be frozen as soon as the response goes out, so nothing is deferred.
+        """
+        with self._lock:
+            if self.persist_path is None or not self._dirty:
+                return
+            self._dirty = False
+            offset = time.time() - time.monotonic()
+            try:
+                body = orjson.dumps({
+                    'version': SNAPSHOT_VERSION,
+                    'entries': [[key, expires_at + offset, value] for key, (expires_at, value) in self._data.items()]
+                })
+            except orjson.JSONEncodeError as e:
+                logger.warning("Cache snapshot to %s failed: %s", self.persist_path, e)
+                return
+        
+        tmp_path = None
+        try:
+            # mkstemp creates the file 0600 under an unpredictable name next to the target
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.persist_path) or '.', suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, self.persist_path)
+        except OSError as e:
+            logger.warning("Cache snapshot to %s failed: %s", self.persist_path, e)
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+    
+    def _ensure_loaded(self):
+        """Load the persisted snapshot once per process (caller holds the lock)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            # O_NOFOLLOW: the snapshot lives in a shared temp dir, never follow a planted symlink
+            fd = os.open(self.persist_path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning("Cache snapshot %s unreadable: %s", self.persist_path, e)
+            return
+        
+        with os.fdopen(fd, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if not self._is_trusted(st):
+                logger.warning("Ignoring cache snapshot %s: not a private file owned by this user", self.persist_path)
+                return
+            if time.time() - st.st_mtime > self.persist_max_age:
+                return
+            try:
+                snapshot = orjson.loads(f.read())
+            except (OSError, orjson.JSONDecodeError) as e:
+                logger.warning("Ignoring cache snapshot %s: %s", self.persist_path, e)
+                return
+        
+        entries = snapshot.get('entries') if isinstance(snapshot, dict) else None
+        if not isinstance(entries, list) or snapshot.get('version') != SNAPSHOT_VERSION:
+            logger.warning("Ignoring cache snapshot %s: unexpected layout", self.persist_path)
+            return
+        
+        # Snapshot expiries are wall-clock; convert back to this process's monotonic clock
+        # (expired entries are kept too, get_stale serves them when the API fails)
+        offset = time.monotonic() - time.time()
+        for entry in entries[-self.maxsize:]:
+            if not (isinstance(entry, list) and len(entry) == 3 and isinstance(entry[0], str)
+                    and isinstance(entry[1], (int, float))):
+                continue  # Malformed entry
+            key, expires_at, value = entry
+            if key not in self._data:
+                self._data[key] = (expires_at + offset, value)
+    
+    @staticmethod
+    def _is_trusted(st: os.stat_result) -> bool:
+        """A regular file owned by this user that nobody else can write"""
+        owner_ok = not hasattr(os, 'getuid') or st.st_uid == os.getuid()
+        return stat.S_ISREG(st.st_mode) and owner_ok and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
@@ -0,0 +1,59 @@
+# Request helpers shared by the API handlers
+import gzip
+import orjson
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def qparam(qs: Dict[str, List[str]], name: str, default: Any,
+           cast: Callable = int, cap: Optional[Any] = None) -> Any:
+    """Read a single query parameter from parse_qs output, cast and optionally capped"""
+    v = qs.get(name)
+    v = cast(v[0]) if v else default
+    return min(v, cap) if cap else v
+
+
+# Responses smaller than this aren't worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+def maybe_gzip(body: bytes, accept_encoding: Optional[str]) -> Tuple[bytes, bool]:
+    """Gzip body (fast level) if the client accepts it and it is large enough; returns (body, gzipped)"""
+    if len(body) > GZIP_MIN_BYTES and 'gzip' in (accept_encoding or ''):
+        return gzip.compress(body, compresslevel=1), True
+    return body, False
+
+
+class CORSMixin:
+    """Adds the CORS response headers shared by every endpoint"""
+    
+    def _cors(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+
+
+class JSONResponseMixin(CORSMixin):
+    """Sends a complete JSON response: orjson body, optional gzip, Content-Length"""
+    
+    # Every response carries Content-Length, so connections can be kept alive
+    protocol_version = 'HTTP/1.1'
+    
+    def _send_json(self, status: int, obj: Any, cache_control: Optional[str] = None,
+                   option: Optional[int] = None):
+        """Serialize (and gzip) obj first, then send the status line, headers and body.
+        
+        A serialization error is raised before anything is queued, so the caller's
+        except branch can still send its own error response.
+        """
+        body, gzipped = maybe_gzip(orjson.dumps(obj, option=option), self.headers.get('Accept-Encoding'))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self._cors()
+        if cache_control:
+            self.send_header('Cache-Control', cache_control)
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
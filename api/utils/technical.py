@@ -1,7 +1,7 @@
 # Technical Analysis utilities for Vercel serverless functions
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from datetime import datetime
 
 class TechnicalAnalysis:
@@ -14,7 +14,16 @@ class TechnicalAnalysis:
         """Calculate Simple Moving Average"""
         if len(prices) < period:
             return pd.Series(dtype=float, index=prices.index)
-        return prices.rolling(window=period, min_periods=period).mean()
+        # Prefix-sum window means: O(N) regardless of period
+        x = prices.to_numpy(dtype=np.float64)
+        if np.isnan(x).any():  # A NaN would poison every later prefix sum
+            return prices.rolling(window=period, min_periods=period).mean()
+        c = np.empty(len(x) + 1)
+        c[0] = 0.0
+        np.cumsum(x, out=c[1:])
+        out = np.full(len(x), np.nan)
+        out[period - 1:] = (c[period:] - c[:-period]) / period
+        return pd.Series(out, index=prices.index)
     
     def calculate_ema(self, prices: pd.Series, period: int) -> pd.Series:
         """Calculate Exponential Moving Average"""
@@ -22,8 +31,52 @@ class TechnicalAnalysis:
             return pd.Series(dtype=float, index=prices.index)
         return prices.ewm(span=period, adjust=False).mean()
     
-    def calculate_all_ma(self, df: pd.DataFrame, symbol: str) -> Dict[str, Any]:
-        """Calculate all moving averages for a symbol"""
+    def compute_indicators(self, df: pd.DataFrame,
+                           windows: Optional[Sequence[int]] = None) -> Dict[Tuple[str, int], pd.Series]:
+        """Compute every SMA/EMA series once, keyed by (ma_type, period)"""
+        indicators: Dict[Tuple[str, int], pd.Series] = {}
+        if df.empty or 'close' not in df.columns:
+            return indicators
+        close_prices = df['close']
+        for period in windows or self.ma_periods:
+            indicators[('sma', period)] = self.calculate_sma(close_prices, period)
+            indicators[('ema', period)] = self.calculate_ema(close_prices, period)
+        return indicators
+    
+    def _get_ma(self, close_prices: pd.Series, ma_type: str, period: int,
+                indicators: Dict[Tuple[str, int], pd.Series]) -> pd.Series:
+        """Get an SMA/EMA series from indicators, computing (and storing) it if missing"""
+        key = (ma_type.lower(), period)
+        series = indicators.get(key)
+        if series is None:
+            if ma_type == 'SMA':
+                series = self.calculate_sma(close_prices, period)
+            else:  # EMA
+                series = self.calculate_ema(close_prices, period)
+            indicators[key] = series
+        return series
+    
+    def calculate_all_ma_and_crossovers(self, df: pd.DataFrame, symbol: str,
+                                        windows: Optional[Sequence[int]] = None,
+                                        ts: Optional[str] = None
+                                        ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Calculate moving averages and crossovers, computing each MA series only once"""
+        indicators = self.compute_indicators(df, windows)
+        ma_data = self.calculate_all_ma(df, symbol, windows, indicators, ts=ts)
+        crossovers = self.detect_crossovers(df, symbol, windows, indicators)
+        return ma_data, crossovers
+    
+    def calculate_all_ma(self, df: pd.DataFrame, symbol: str,
+                         windows: Optional[Sequence[int]] = None,
+                         indicators: Optional[Dict[Tuple[str, int], pd.Series]] = None,
+                         ts: Optional[str] = None) -> Dict[str, Any]:
+        """Calculate all moving averages for a symbol (windows defaults to ma_periods).
+        
+        ts is the ISO timestamp to stamp the result with; batch callers pass one
+        per request instead of formatting datetime.now() for every symbol.
+        """
+        if indicators is None:
+            indicators = {}
         if df.empty or 'close' not in df.columns:
             return {'symbol': symbol, 'error': 'No price data available'}
         
@@ -34,19 +87,34 @@ class TechnicalAnalysis:
         ma_data = {
             'symbol': symbol,
             'current_price': latest_price,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': ts or datetime.now().isoformat(),
             'data_points': len(df),
             'moving_averages': {}
         }
         
-        for period in self.ma_periods:
-            sma = self.calculate_sma(close_prices, period)
-            ema = self.calculate_ema(close_prices, period)
+        for period in windows or self.ma_periods:
+            if period > len(df):
+                # Too little history for this window: the same all-None entry, without computing the MAs
+                ma_info = {
+                    'period': period,
+                    'sma_value': None,
+                    'ema_value': None,
+                    'sma_trend': 'neutral',
+                    'ema_trend': 'neutral',
+                    'price_vs_sma': None,
+                    'price_vs_ema': None
+                }
+                ma_data['moving_averages'][f'ma_{period}'] = ma_info
+                continue
+            
+            sma = self._get_ma(close_prices, 'SMA', period, indicators).to_numpy()
+            ema = self._get_ma(close_prices, 'EMA', period, indicators).to_numpy()
             
+            # Tail reads on the raw arrays (NaN only during ramp-up)
             ma_info = {
                 'period': period,
-                'sma_value': float(sma.iloc[-1]) if not sma.empty and not pd.isna(sma.iloc[-1]) else None,
-                'ema_value': float(ema.iloc[-1]) if not ema.empty and not pd.isna(ema.iloc[-1]) else None,
+                'sma_value': float(sma[-1]) if sma.size and not np.isnan(sma[-1]) else None,
+                'ema_value': float(ema[-1]) if ema.size and not np.isnan(ema[-1]) else None,
                 'sma_trend': self._get_trend(sma),
                 'ema_trend': self._get_trend(ema),
                 'price_vs_sma': None,
@@ -66,9 +134,14 @@ class TechnicalAnalysis:
         
         return ma_data
     
-    def detect_crossovers(self, df: pd.DataFrame, symbol: str) -> List[Dict[str, Any]]:
-        """Detect moving average crossovers"""
-        if df.empty or len(df) < 200:  # Need enough data for 200-period MA
+    def detect_crossovers(self, df: pd.DataFrame, symbol: str,
+                          windows: Optional[Sequence[int]] = None,
+                          indicators: Optional[Dict[Tuple[str, int], pd.Series]] = None) -> List[Dict[str, Any]]:
+        """Detect moving average crossovers (only pairs whose periods are in windows)"""
+        if indicators is None:
+            indicators = {}
+        windows = windows or self.ma_periods
+        if df.empty or len(df) < max(windows):  # Need enough data for the longest MA
             return []
         
         close_prices = df['close']
@@ -80,18 +153,18 @@ class TechnicalAnalysis:
             {'fast': 50, 'slow': 200, 'type': 'SMA'},
             {'fast': 20, 'slow': 50, 'type': 'EMA'}
         ]
+        crossover_pairs = [
+            pair for pair in crossover_pairs
+            if pair['fast'] in windows and pair['slow'] in windows
+        ]
         
         for pair in crossover_pairs:
             fast_period = pair['fast']
             slow_period = pair['slow']
             ma_type = pair['type']
             
-            if ma_type == 'SMA':
-                fast_ma = self.calculate_sma(close_prices, fast_period)
-                slow_ma = self.calculate_sma(close_prices, slow_period)
-            else:  # EMA
-                fast_ma = self.calculate_ema(close_prices, fast_period)
-                slow_ma = self.calculate_ema(close_prices, slow_period)
+            fast_ma = self._get_ma(close_prices, ma_type, fast_period, indicators)
+            slow_ma = self._get_ma(close_prices, ma_type, slow_period, indicators)
             
             # Check for crossovers in the last few periods
             crossover = self._detect_crossover_pair(fast_ma, slow_ma, symbol, pair)
@@ -106,18 +179,15 @@ class TechnicalAnalysis:
         if len(fast_ma) < 2 or len(slow_ma) < 2:
             return None
         
-        # Get recent values
-        fast_ma_clean = fast_ma.dropna()
-        slow_ma_clean = slow_ma.dropna()
+        # Get recent values (MAs are only NaN during ramp-up, so a valid [-2] means both are valid)
+        fast_arr = fast_ma.to_numpy()
+        slow_arr = slow_ma.to_numpy()
+        prev_fast, current_fast = float(fast_arr[-2]), float(fast_arr[-1])
+        prev_slow, current_slow = float(slow_arr[-2]), float(slow_arr[-1])
         
-        if len(fast_ma_clean) < 2 or len(slow_ma_clean) < 2:
+        if np.isnan(prev_fast) or np.isnan(prev_slow):
             return None
         
-        current_fast = float(fast_ma_clean.iloc[-1])
-        current_slow = float(slow_ma_clean.iloc[-1])
-        prev_fast = float(fast_ma_clean.iloc[-2])
-        prev_slow = float(slow_ma_clean.iloc[-2])
-        
         crossover_type = None
         if prev_fast <= prev_slow and current_fast > current_slow:
             crossover_type = "GOLDEN_CROSS"  # Bullish
@@ -128,7 +198,7 @@ class TechnicalAnalysis:
             return {
                 'symbol': symbol,
                 'type': crossover_type,
-                'timestamp': fast_ma_clean.index[-1].isoformat(),
+                'timestamp': fast_ma.index[-1].isoformat(),
                 'ma_type': config['type'],
                 'fast_period': config['fast'],
                 'slow_period': config['slow'],
@@ -140,21 +210,14 @@ class TechnicalAnalysis:
         
         return None
     
-    def _get_trend(self, ma_series: pd.Series, periods: int = 5) -> str:
-        """Determine trend direction of moving average"""
-        if ma_series.empty or len(ma_series) < periods:
-            return 'neutral'
-        
-        clean_ma = ma_series.dropna()
-        if len(clean_ma) < periods:
+    def _get_trend(self, arr: np.ndarray, periods: int = 5) -> str:
+        """Determine trend direction of moving average (arr is the raw MA values)"""
+        clean_ma = arr[~np.isnan(arr)]
+        if clean_ma.size < max(periods, 2):
             return 'neutral'
         
-        recent_values = clean_ma.iloc[-periods:]
-        if len(recent_values) < 2:
-            return 'neutral'
-        
-        first_value = recent_values.iloc[0]
-        last_value = recent_values.iloc[-1]
+        first_value = clean_ma[-periods]
+        last_value = clean_ma[-1]
         
         change_pct = (last_value - first_value) / first_value * 100
         
@@ -165,43 +228,36 @@ class TechnicalAnalysis:
         else:
             return 'neutral'
     
-    def get_market_summary(self, symbols_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate market summary from multiple symbols"""
+    def get_market_summary(self, symbols_data: List[Dict[str, Any]],
+                           ts: Optional[str] = None) -> Dict[str, Any]:
+        """Generate market summary from multiple symbols.
+        
+        Each entry of symbols_data is a flat row with price_vs_ma20/50/200
+        ('above'/'below'/None) and golden_cross_count/death_cross_count.
+        """
+        ts = ts or datetime.now().isoformat()
         if not symbols_data:
             return {
                 'total_symbols': 0,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': ts,
                 'error': 'No data available'
             }
         
-        # Count crossovers and trends
-        golden_crosses = 0
-        death_crosses = 0
-        above_ma20 = 0
-        above_ma50 = 0
-        above_ma200 = 0
-        
-        for data in symbols_data:
-            if 'crossovers' in data:
-                for crossover in data['crossovers']:
-                    if crossover['type'] == 'GOLDEN_CROSS':
-                        golden_crosses += 1
-                    elif crossover['type'] == 'DEATH_CROSS':
-                        death_crosses += 1
-            
-            if 'moving_averages' in data:
-                ma_data = data['moving_averages']
-                if 'ma_20' in ma_data and ma_data['ma_20'].get('price_vs_sma') == 'above':
-                    above_ma20 += 1
-                if 'ma_50' in ma_data and ma_data['ma_50'].get('price_vs_sma') == 'above':
-                    above_ma50 += 1
-                if 'ma_200' in ma_data and ma_data['ma_200'].get('price_vs_sma') == 'above':
-                    above_ma200 += 1
+        # Count crossovers and trends in one reduction over the flat per-symbol fields
+        counts = np.array([
+            (data.get('price_vs_ma20') == 'above',
+             data.get('price_vs_ma50') == 'above',
+             data.get('price_vs_ma200') == 'above',
+             data.get('golden_cross_count', 0),
+             data.get('death_cross_count', 0))
+            for data in symbols_data
+        ], dtype=np.int64).sum(axis=0)
+        above_ma20, above_ma50, above_ma200, golden_crosses, death_crosses = counts.tolist()
         
         total_symbols = len(symbols_data)
         
         return {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': ts,
             'total_symbols': total_symbols,
             'crossover_summary': {
                 'golden_crosses': golden_crosses,
@@ -213,6 +269,11 @@ class TechnicalAnalysis:
                 'above_ma50_pct': (above_ma50 / total_symbols * 100) if total_symbols > 0 else 0,
                 'above_ma200_pct': (above_ma200 / total_symbols * 100) if total_symbols > 0 else 0
             },
+            'above_ma_counts': {
+                'ma20': above_ma20,
+                'ma50': above_ma50,
+                'ma200': above_ma200
+            },
             'market_strength': self._calculate_market_strength(above_ma20, above_ma50, above_ma200, total_symbols)
         }
     
@@ -22,7 +22,7 @@ class Settings:
     TIMEFRAME = '1d'  # Daily timeframe
     
     # Rate Limiting
-    API_REQUEST_DELAY = 0.1  # seconds between requests
+    MAX_CONCURRENCY = 8  # concurrent kline requests (keeps well inside Binance's request-weight limit)
     MAX_RETRIES = 3
     RETRY_DELAY = 5  # seconds
     
@@ -8,6 +8,7 @@ import os
 import sys
 import argparse
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import json
 
 # Add src to path
@@ -18,7 +19,7 @@ from src.binance_client import BinanceClient
 from src.technical_analysis import TechnicalAnalysis
 from src.signal_detector import SignalDetector
 from src.alert_manager import AlertManager
-from src.utils import setup_logging, PerformanceTimer, create_summary_stats
+from src.utils import setup_logging, PerformanceTimer, create_summary_stats, dump_json
 
 
 class CryptoAnalysisApp:
@@ -158,7 +159,7 @@ class CryptoAnalysisApp:
         
         # Step 8: Export data
         self.logger.info("Step 8: Exporting data...")
-        self._export_results(ma_data, crossovers, alerts)
+        self._export_results(ma_data, crossovers, alerts, results)
         
         # Step 9: Display dashboard
         self.logger.info("Step 9: Displaying results...")
@@ -171,28 +172,21 @@ class CryptoAnalysisApp:
         self.logger.info(f"Analysis completed successfully in {total_timer.elapsed_seconds:.2f}s")
         return results
     
-    def _export_results(self, ma_data: dict, crossovers: list, alerts: list):
+    def _export_results(self, ma_data: dict, crossovers: list, alerts: list, results: dict):
         """Export analysis results to files"""
         try:
             timestamp = datetime.now().strftime('%Y-%m-%d')
             
-            # Export moving averages
             ma_filename = os.path.join(Settings.DATA_DIR, f'moving_averages_{timestamp}.csv')
-            self.technical_analysis.export_ma_data(ma_data, ma_filename)
-            
-            # Export crossover alerts
             alerts_csv = os.path.join(Settings.DATA_DIR, f'crossover_alerts_{timestamp}.csv')
-            self.alert_manager.export_alerts_csv(alerts, alerts_csv)
-            
-            # Export JSON summary
             alerts_json = os.path.join(Settings.DATA_DIR, f'analysis_results_{timestamp}.json')
             summary_data = {
                 'analysis_timestamp': datetime.now().isoformat(),
                 'total_symbols_analyzed': len(ma_data),
                 'crossovers_detected': crossovers,
                 'alerts_generated': alerts,
-                'signal_statistics': self.signal_detector.get_signal_statistics(crossovers),
-                'alert_summary': self.alert_manager.get_alert_summary(alerts),
+                'signal_statistics': results['signal_statistics'],
+                'alert_summary': results['alert_summary'],
                 'configuration': {
                     'ma_periods': Settings.MA_PERIODS,
                     'crossover_types': Settings.CROSSOVER_TYPES,
@@ -200,8 +194,20 @@ class CryptoAnalysisApp:
                 }
             }
             
-            with open(alerts_json, 'w', encoding='utf-8') as f:
-                json.dump(summary_data, f, indent=2, default=str)
+            def write_summary():
+                with open(alerts_json, 'wb') as f:
+                    f.write(dump_json(summary_data, indent=True))
+            
+            # The three files are independent: export moving averages, crossover
+            # alerts and the JSON summary concurrently so encoding overlaps the writes
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                futures = [
+                    executor.submit(self.technical_analysis.export_ma_data, ma_data, ma_filename),
+                    executor.submit(self.alert_manager.export_alerts_csv, alerts, alerts_csv),
+                    executor.submit(write_summary)
+                ]
+                for future in futures:
+                    future.result()
             
             self.logger.info("Results exported successfully")
             print(f"📁 Results exported to {Settings.DATA_DIR}/")
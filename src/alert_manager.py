@@ -1,107 +1,204 @@
 # Alert Management System for Cryptocurrency Trading Signals
-import json
 import os
+import sys
 import csv
-from typing import Dict, List, Any, Optional, Set
+import logging
+from typing import Dict, List, Any, Optional, Set, Tuple
 from datetime import datetime, timedelta
 import hashlib
+from dataclasses import dataclass, fields
+
+import numpy as np
 
 from config.settings import Settings
-from src.utils import setup_logging, PerformanceTimer
+from src.utils import setup_logging, PerformanceTimer, dump_json, load_json
+
+
+_BAR = "=" * 60
+
+
+@dataclass(slots=True)
+class Alert:
+    """A single crossover alert; a slotted record instead of a per-alert dict"""
+    id: str
+    timestamp: str
+    symbol: str = 'UNKNOWN'
+    alert_type: str = 'CROSSOVER'
+    signal_type: str = 'UNKNOWN'
+    importance: str = 'MEDIUM'
+    crossover_name: str = ''
+    ma_type: str = ''
+    fast_period: int = 0
+    slow_period: int = 0
+    current_price: float = 0
+    fast_ma_value: float = 0
+    slow_ma_value: float = 0
+    percentage_diff: float = 0
+    strength: str = 'UNKNOWN'
+    direction: str = 'NEUTRAL'
+    crossover_timestamp: str = ''
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Public JSON schema of the alert"""
+        return {name: getattr(self, name) for name in _ALERT_FIELDS}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Alert':
+        """Build an alert from its dict form, ignoring unknown keys"""
+        return cls(**{key: value for key, value in data.items() if key in _ALERT_FIELD_SET})
+
+
+_ALERT_FIELDS = tuple(f.name for f in fields(Alert))
+_ALERT_FIELD_SET = frozenset(_ALERT_FIELDS)
 
 
 class AlertManager:
     """Manage cryptocurrency trading alerts and notifications"""
     
+    _IMPORTANCE_LEVELS = {'HIGH': 3, 'MEDIUM': 2, 'LOW': 1}
+    _IMPORTANCE_EMOJI = {"HIGH": "🚨", "MEDIUM": "⚠️", "LOW": "ℹ️"}
+    _SIGNAL_EMOJI = {"DEATH_CROSS": "🔴"}
+    
+    # Lookup tables for the default importance classifier
+    _STRENGTH_POINTS = {'STRONG': 3, 'MEDIUM': 2, 'WEAK': 1}
+    _IMPORTANCE_CUTOFFS = np.array([3, 6], dtype=np.int8)
+    _IMPORTANCE_BY_LEVEL = np.array(['LOW', 'MEDIUM', 'HIGH'], dtype=object)
+    
     def __init__(self):
         self.logger = setup_logging()
-        self.alert_history: List[Dict[str, Any]] = []
+        self.alert_history: List[Alert] = []
+        self._alert_epochs = np.empty(0)  # alert_history timestamps as epoch seconds, kept in step
         self.sent_alerts: Set[str] = set()  # Track sent alerts to avoid duplicates
-        self.alert_file = os.path.join(Settings.DATA_DIR, 'alert_history.json')
+        self.alert_file = os.path.join(Settings.DATA_DIR, 'alert_history.ndjson')
+        self._legacy_alert_file = os.path.join(Settings.DATA_DIR, 'alert_history.json')
         self.load_alert_history()
     
-    def generate_alert_id(self, alert_data: Dict[str, Any]) -> str:
+    @staticmethod
+    def _timestamp_epochs(alerts: List[Alert]) -> np.ndarray:
+        """Parse alert ISO timestamps once into an array of epoch seconds"""
+        return np.fromiter(
+            (datetime.fromisoformat(alert.timestamp.replace('Z', '+00:00')).timestamp() for alert in alerts),
+            dtype=np.float64, count=len(alerts)
+        )
+    
+    def generate_alert_id(self, alert_data: Dict[str, Any], now: Optional[datetime] = None) -> str:
         """Generate unique ID for an alert to prevent duplicates"""
-        # Create hash based on symbol, crossover type, and timestamp (to hour precision)
-        key_data = {
-            'symbol': alert_data.get('symbol', ''),
-            'crossover_name': alert_data.get('crossover_name', ''),
-            'type': alert_data.get('type', ''),
-            'timestamp_hour': alert_data.get('timestamp', datetime.now()).strftime('%Y-%m-%d %H')
-        }
-        
-        key_string = json.dumps(key_data, sort_keys=True)
-        return hashlib.md5(key_string.encode()).hexdigest()
+        # Hash symbol, crossover name/type and timestamp (to hour precision)
+        ts = alert_data.get('timestamp') or now or datetime.now()
+        hour = ts.strftime('%Y-%m-%d %H') if hasattr(ts, 'strftime') else str(ts)[:13]
+        key = (
+            f"{alert_data.get('symbol', '')}\x1f{alert_data.get('crossover_name', '')}"
+            f"\x1f{alert_data.get('type', '')}\x1f{hour}"
+        )
+        return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
     
-    def create_alert(self, crossover_data: Dict[str, Any], importance: str = 'MEDIUM') -> Dict[str, Any]:
+    def create_alert(self, crossover_data: Dict[str, Any], importance: str = 'MEDIUM',
+                     now: Optional[datetime] = None, alert_id: Optional[str] = None,
+                     now_iso: Optional[str] = None) -> Alert:
         """Create an alert from crossover data"""
-        alert = {
-            'id': self.generate_alert_id(crossover_data),
-            'timestamp': datetime.now().isoformat(),
-            'symbol': crossover_data.get('symbol', 'UNKNOWN'),
-            'alert_type': 'CROSSOVER',
-            'signal_type': crossover_data.get('type', 'UNKNOWN'),
-            'importance': importance,
-            'crossover_name': crossover_data.get('crossover_name', ''),
-            'ma_type': crossover_data.get('ma_type', ''),
-            'fast_period': crossover_data.get('fast_period', 0),
-            'slow_period': crossover_data.get('slow_period', 0),
-            'current_price': crossover_data.get('current_price', 0),
-            'fast_ma_value': crossover_data.get('fast_ma_value', 0),
-            'slow_ma_value': crossover_data.get('slow_ma_value', 0),
-            'percentage_diff': crossover_data.get('percentage_diff', 0),
-            'strength': crossover_data.get('strength', 'UNKNOWN'),
-            'direction': crossover_data.get('direction', 'NEUTRAL'),
-            'crossover_timestamp': crossover_data.get('timestamp', datetime.now()).isoformat() if hasattr(crossover_data.get('timestamp', datetime.now()), 'isoformat') else str(crossover_data.get('timestamp', datetime.now()))
-        }
+        now = now or datetime.now()
+        now_iso = now_iso or now.isoformat()
         
-        return alert
+        crossover_ts = crossover_data.get('timestamp')
+        if crossover_ts is None:
+            crossover_ts = now_iso
+        elif isinstance(crossover_ts, datetime):
+            crossover_ts = crossover_ts.isoformat()
+        else:
+            crossover_ts = str(crossover_ts)
+        
+        return Alert(
+            id=alert_id or self.generate_alert_id(crossover_data, now),
+            timestamp=now_iso,
+            symbol=crossover_data.get('symbol', 'UNKNOWN'),
+            alert_type='CROSSOVER',
+            signal_type=crossover_data.get('type', 'UNKNOWN'),
+            importance=importance,
+            crossover_name=crossover_data.get('crossover_name', ''),
+            ma_type=crossover_data.get('ma_type', ''),
+            fast_period=crossover_data.get('fast_period', 0),
+            slow_period=crossover_data.get('slow_period', 0),
+            current_price=crossover_data.get('current_price', 0),
+            fast_ma_value=crossover_data.get('fast_ma_value', 0),
+            slow_ma_value=crossover_data.get('slow_ma_value', 0),
+            percentage_diff=crossover_data.get('percentage_diff', 0),
+            strength=crossover_data.get('strength', 'UNKNOWN'),
+            direction=crossover_data.get('direction', 'NEUTRAL'),
+            crossover_timestamp=crossover_ts
+        )
     
     def process_crossovers_to_alerts(self, crossovers: List[Dict[str, Any]], 
-                                   importance_classifier_func=None) -> List[Dict[str, Any]]:
+                                   importance_classifier_func=None) -> List[Alert]:
         """Convert crossover signals to alerts"""
-        alerts = []
-        new_alerts_count = 0
+        if not crossovers:
+            return []
         
         self.logger.info(f"Processing {len(crossovers)} crossovers into alerts")
+        now = datetime.now()  # One clock read (and one isoformat) for the whole batch
+        now_iso = now.isoformat()
+        debug = self.logger.isEnabledFor(logging.DEBUG)  # Skip building per-alert messages otherwise
         
-        for crossover in crossovers:
-            # Determine importance
-            if importance_classifier_func:
-                importance = importance_classifier_func(crossover)
+        # Check for duplicates on ids alone, before any alert is built
+        seen = self.sent_alerts
+        new_ids: Dict[str, int] = {}  # id -> index of its first crossover in this batch
+        for k, crossover in enumerate(crossovers):
+            alert_id = self.generate_alert_id(crossover, now)
+            if alert_id in seen or alert_id in new_ids:
+                if debug:
+                    self.logger.debug(f"Duplicate alert skipped: {crossover.get('symbol', 'UNKNOWN')} - {crossover.get('type', 'UNKNOWN')}")
             else:
-                importance = self._classify_default_importance(crossover)
-            
-            alert = self.create_alert(crossover, importance)
-            alert_id = alert['id']
-            
-            # Check for duplicates
-            if alert_id not in self.sent_alerts:
-                alerts.append(alert)
-                self.sent_alerts.add(alert_id)
-                new_alerts_count += 1
-                self.logger.debug(f"New alert created: {alert['symbol']} - {alert['signal_type']}")
-            else:
-                self.logger.debug(f"Duplicate alert skipped: {alert['symbol']} - {alert['signal_type']}")
+                new_ids[alert_id] = k
+        seen.update(new_ids)
+        
+        # Determine importance for the survivors only
+        survivors = [crossovers[k] for k in new_ids.values()]
+        if importance_classifier_func:
+            importances = [importance_classifier_func(crossover) for crossover in survivors]
+        else:
+            importances = self._classify_default_importance_batch(survivors)
         
-        self.logger.info(f"Created {new_alerts_count} new alerts, skipped {len(crossovers) - new_alerts_count} duplicates")
+        alerts = [
+            self.create_alert(crossover, importance, now, alert_id, now_iso)
+            for alert_id, crossover, importance in zip(new_ids, survivors, importances)
+        ]
+        if debug:
+            for alert in alerts:
+                self.logger.debug(f"New alert created: {alert.symbol} - {alert.signal_type}")
+        
+        self.logger.info(f"Created {len(alerts)} new alerts, skipped {len(crossovers) - len(alerts)} duplicates")
         return alerts
     
+    def _classify_default_importance_batch(self, crossovers: List[Dict[str, Any]]) -> List[str]:
+        """Vectorized _classify_default_importance over a whole batch"""
+        n = len(crossovers)
+        if n == 0:
+            return []
+        
+        # Strength is int-coded to its score while the batch is read in
+        strength_points = self._STRENGTH_POINTS.get
+        score = np.fromiter((strength_points(c.get('strength', 'MINIMAL'), 0) for c in crossovers),
+                            dtype=np.int8, count=n)
+        slow = np.fromiter((c.get('slow_period', 20) for c in crossovers), dtype=np.float64, count=n)
+        pct = np.fromiter((c.get('percentage_diff', 0) for c in crossovers), dtype=np.float64, count=n)
+        
+        # Each threshold passed is worth one point; accumulate in place
+        score += 1
+        score += slow >= 50
+        score += slow >= 200
+        score += pct > 2
+        score += pct > 5
+        
+        # 0-2 -> LOW, 3-5 -> MEDIUM, 6+ -> HIGH
+        return self._IMPORTANCE_BY_LEVEL[np.searchsorted(self._IMPORTANCE_CUTOFFS, score, side='right')].tolist()
+    
     def _classify_default_importance(self, crossover: Dict[str, Any]) -> str:
         """Default importance classification logic"""
         strength = crossover.get('strength', 'MINIMAL')
         slow_period = crossover.get('slow_period', 20)
         percentage_diff = crossover.get('percentage_diff', 0)
         
-        score = 0
-        
         # Score based on strength
-        if strength == 'STRONG':
-            score += 3
-        elif strength == 'MEDIUM':
-            score += 2
-        elif strength == 'WEAK':
-            score += 1
+        score = self._STRENGTH_POINTS.get(strength, 0)
         
         # Score based on MA periods
         if slow_period >= 200:
@@ -125,40 +222,44 @@ class AlertManager:
         else:
             return 'LOW'
     
-    def filter_alerts_by_importance(self, alerts: List[Dict[str, Any]], 
-                                   min_importance: str = 'LOW') -> List[Dict[str, Any]]:
+    def filter_alerts_by_importance(self, alerts: List[Alert], 
+                                   min_importance: str = 'LOW') -> List[Alert]:
         """Filter alerts by minimum importance level"""
-        importance_levels = {'HIGH': 3, 'MEDIUM': 2, 'LOW': 1}
-        min_level = importance_levels.get(min_importance, 1)
+        level = self._IMPORTANCE_LEVELS.get
+        min_level = level(min_importance, 1)
         
         filtered = [
             alert for alert in alerts 
-            if importance_levels.get(alert.get('importance', 'LOW'), 1) >= min_level
+            if level(alert.importance, 1) >= min_level
         ]
         
         self.logger.info(f"Filtered {len(filtered)}/{len(alerts)} alerts with importance >= {min_importance}")
         return filtered
     
-    def add_alerts_to_history(self, alerts: List[Dict[str, Any]]):
+    def add_alerts_to_history(self, alerts: List[Alert]):
         """Add alerts to the persistent history"""
+        if not alerts:
+            return
+        
         self.alert_history.extend(alerts)
-        self.save_alert_history()
+        self._alert_epochs = np.concatenate((self._alert_epochs, self._timestamp_epochs(alerts)))
+        self._append_alerts(alerts)
         self.logger.info(f"Added {len(alerts)} alerts to history. Total: {len(self.alert_history)}")
     
-    def get_recent_alerts(self, hours_back: int = 24) -> List[Dict[str, Any]]:
+    def get_recent_alerts(self, hours_back: int = 24) -> List[Alert]:
         """Get alerts from the last N hours"""
-        cutoff_time = datetime.now() - timedelta(hours=hours_back)
-        
-        recent_alerts = []
-        for alert in self.alert_history:
-            alert_time = datetime.fromisoformat(alert['timestamp'].replace('Z', '+00:00'))
-            if alert_time >= cutoff_time:
-                recent_alerts.append(alert)
-        
-        return recent_alerts
+        cutoff = (datetime.now() - timedelta(hours=hours_back)).timestamp()
+        history = self.alert_history
+        return [history[i] for i in np.flatnonzero(self._alert_epochs >= cutoff)]
     
-    def get_alert_summary(self, alerts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def get_alert_summary(self, alerts: List[Alert]) -> Dict[str, Any]:
         """Generate summary statistics for alerts"""
+        return self._summarize_alerts(alerts)[0]
+    
+    def _summarize_alerts(self, alerts: List[Alert],
+                          max_high: int = 0) -> Tuple[Dict[str, Any], List[Alert]]:
+        """Summary statistics plus the first max_high HIGH alerts, in one pass"""
+        high_alerts = []
         if not alerts:
             return {
                 'total_alerts': 0,
@@ -168,60 +269,65 @@ class AlertManager:
                 'golden_crosses': 0,
                 'death_crosses': 0,
                 'unique_symbols': 0
-            }
+            }, high_alerts
         
-        summary = {
-            'total_alerts': len(alerts),
-            'high_importance': 0,
-            'medium_importance': 0,
-            'low_importance': 0,
-            'golden_crosses': 0,
-            'death_crosses': 0,
-            'unique_symbols': len(set(alert['symbol'] for alert in alerts)),
-            'timestamp': datetime.now().isoformat(),
-            'symbols': list(set(alert['symbol'] for alert in alerts))
-        }
+        symbols = set()
+        high = medium = golden = death = 0
         
+        # One pass over the alerts for every counter
         for alert in alerts:
+            symbols.add(alert.symbol)
+            
             # Count by importance
-            importance = alert.get('importance', 'LOW')
+            importance = alert.importance
             if importance == 'HIGH':
-                summary['high_importance'] += 1
+                high += 1
+                if len(high_alerts) < max_high:
+                    high_alerts.append(alert)
             elif importance == 'MEDIUM':
-                summary['medium_importance'] += 1
-            else:
-                summary['low_importance'] += 1
+                medium += 1
             
             # Count by signal type
-            signal_type = alert.get('signal_type', '')
+            signal_type = alert.signal_type
             if signal_type == 'GOLDEN_CROSS':
-                summary['golden_crosses'] += 1
+                golden += 1
             elif signal_type == 'DEATH_CROSS':
-                summary['death_crosses'] += 1
+                death += 1
         
-        return summary
+        return {
+            'total_alerts': len(alerts),
+            'high_importance': high,
+            'medium_importance': medium,
+            'low_importance': len(alerts) - high - medium,
+            'golden_crosses': golden,
+            'death_crosses': death,
+            'unique_symbols': len(symbols),
+            'timestamp': datetime.now().isoformat(),
+            'symbols': list(symbols)
+        }, high_alerts
     
-    def format_alert_message(self, alert: Dict[str, Any]) -> str:
+    def format_alert_message(self, alert: Alert) -> str:
         """Format alert into readable message"""
-        signal_emoji = "🔴" if alert['signal_type'] == 'DEATH_CROSS' else "🟢"
-        importance_emoji = {"HIGH": "🚨", "MEDIUM": "⚠️", "LOW": "ℹ️"}.get(alert['importance'], "ℹ️")
-        
-        message = f"{importance_emoji} {signal_emoji} {alert['symbol']}\n"
-        message += f"Signal: {alert['signal_type']} ({alert['crossover_name']})\n"
-        message += f"Price: ${alert['current_price']:.4f}\n"
-        message += f"Strength: {alert['strength']} ({alert['percentage_diff']:.2f}%)\n"
-        message += f"Time: {alert['crossover_timestamp']}\n"
+        signal_emoji = self._SIGNAL_EMOJI.get(alert.signal_type, "🟢")
+        importance_emoji = self._IMPORTANCE_EMOJI.get(alert.importance, "ℹ️")
         
-        return message
+        return "\n".join((
+            f"{importance_emoji} {signal_emoji} {alert.symbol}",
+            f"Signal: {alert.signal_type} ({alert.crossover_name})",
+            f"Price: ${alert.current_price:.4f}",
+            f"Strength: {alert.strength} ({alert.percentage_diff:.2f}%)",
+            f"Time: {alert.crossover_timestamp}",
+            ""
+        ))
     
-    def export_alerts_csv(self, alerts: List[Dict[str, Any]], filename: str) -> bool:
+    def export_alerts_csv(self, alerts: List[Alert], filename: str) -> bool:
         """Export alerts to CSV file"""
         try:
             if not alerts:
                 self.logger.warning("No alerts to export")
                 return False
             
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            with open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
                 fieldnames = [
                     'timestamp', 'symbol', 'signal_type', 'importance', 'crossover_name',
                     'ma_type', 'fast_period', 'slow_period', 'current_price',
@@ -229,11 +335,10 @@ class AlertManager:
                     'direction', 'crossover_timestamp'
                 ]
                 
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for alert in alerts:
-                    writer.writerow({field: alert.get(field, '') for field in fieldnames})
+                # Rows as tuples in field order; writerows drains them in one call
+                writer = csv.writer(csvfile)
+                writer.writerow(fieldnames)
+                writer.writerows([tuple(getattr(alert, field) for field in fieldnames) for alert in alerts])
             
             self.logger.info(f"Exported {len(alerts)} alerts to {filename}")
             return True
@@ -242,16 +347,16 @@ class AlertManager:
             self.logger.error(f"Error exporting alerts to CSV: {e}")
             return False
     
-    def export_alerts_json(self, alerts: List[Dict[str, Any]], filename: str) -> bool:
+    def export_alerts_json(self, alerts: List[Alert], filename: str) -> bool:
         """Export alerts to JSON file"""
         try:
-            with open(filename, 'w', encoding='utf-8') as jsonfile:
-                json.dump({
+            with open(filename, 'wb') as jsonfile:
+                jsonfile.write(dump_json({
                     'alerts': alerts,
                     'summary': self.get_alert_summary(alerts),
                     'export_timestamp': datetime.now().isoformat(),
                     'total_count': len(alerts)
-                }, jsonfile, indent=2, default=str)
+                }, indent=True))
             
             self.logger.info(f"Exported {len(alerts)} alerts to {filename}")
             return True
@@ -261,11 +366,20 @@ class AlertManager:
             return False
     
     def save_alert_history(self):
-        """Save alert history to file"""
+        """Rewrite the whole alert history file (compaction)"""
         try:
             os.makedirs(Settings.DATA_DIR, exist_ok=True)
-            with open(self.alert_file, 'w', encoding='utf-8') as f:
-                json.dump(self.alert_history, f, indent=2, default=str)
+            with open(self.alert_file, 'wb') as f:
+                f.write(b''.join(dump_json(alert) + b'\n' for alert in self.alert_history))
+        except Exception as e:
+            self.logger.error(f"Error saving alert history: {e}")
+    
+    def _append_alerts(self, alerts: List[Alert]):
+        """Append new alerts to the history file, one JSON object per line"""
+        try:
+            os.makedirs(Settings.DATA_DIR, exist_ok=True)
+            with open(self.alert_file, 'ab') as f:
+                f.write(b''.join(dump_json(alert) + b'\n' for alert in alerts))
         except Exception as e:
             self.logger.error(f"Error saving alert history: {e}")
     
@@ -273,64 +387,87 @@ class AlertManager:
         """Load alert history from file"""
         try:
             if os.path.exists(self.alert_file):
-                with open(self.alert_file, 'r', encoding='utf-8') as f:
-                    self.alert_history = json.load(f)
+                with open(self.alert_file, 'rb') as f:
+                    self.alert_history = [Alert.from_dict(load_json(line)) for line in f if line.strip()]
+            elif os.path.exists(self._legacy_alert_file):
+                # One-off migration from the old whole-file JSON history
+                with open(self._legacy_alert_file, 'rb') as f:
+                    self.alert_history = [Alert.from_dict(alert) for alert in load_json(f.read())]
+                self.save_alert_history()
+            
+            if self.alert_history:
+                self._alert_epochs = self._timestamp_epochs(self.alert_history)
                     
                 # Rebuild sent alerts set from history (last 24 hours)
                 recent_alerts = self.get_recent_alerts(24)
-                self.sent_alerts = {alert['id'] for alert in recent_alerts}
+                self.sent_alerts = {alert.id for alert in recent_alerts}
                 
                 self.logger.info(f"Loaded {len(self.alert_history)} alerts from history")
         except Exception as e:
             self.logger.error(f"Error loading alert history: {e}")
             self.alert_history = []
+            self._alert_epochs = np.empty(0)
     
     def cleanup_old_alerts(self, days_to_keep: int = 30):
         """Remove old alerts from history to prevent file from growing too large"""
-        cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+        cutoff = (datetime.now() - timedelta(days=days_to_keep)).timestamp()
         
         original_count = len(self.alert_history)
-        self.alert_history = [
-            alert for alert in self.alert_history
-            if datetime.fromisoformat(alert['timestamp'].replace('Z', '+00:00')) >= cutoff_date
-        ]
+        
+        # Ids only block repeats for 24h (see load_alert_history); forget the ones whose
+        # alerts have all aged past that so sent_alerts stays bounded in long-running use
+        history = self.alert_history
+        recent = self._alert_epochs >= (datetime.now() - timedelta(hours=24)).timestamp()
+        fresh_ids = {history[i].id for i in np.flatnonzero(recent)}
+        self.sent_alerts -= {history[i].id for i in np.flatnonzero(~recent)} - fresh_ids
+        
+        keep = self._alert_epochs >= cutoff
+        self.alert_history = [alert for alert, kept in zip(self.alert_history, keep) if kept]
+        self._alert_epochs = self._alert_epochs[keep]
         
         removed_count = original_count - len(self.alert_history)
         if removed_count > 0:
             self.save_alert_history()
             self.logger.info(f"Cleaned up {removed_count} old alerts, kept {len(self.alert_history)}")
     
-    def print_alert_dashboard(self, alerts: List[Dict[str, Any]]):
+    def print_alert_dashboard(self, alerts: List[Alert]):
         """Print a simple text dashboard of current alerts"""
         if not alerts:
-            print("\n" + "="*50)
-            print("📊 CRYPTO ALERTS DASHBOARD")
-            print("="*50)
-            print("No alerts at this time.")
-            print("="*50 + "\n")
+            sys.stdout.write("\n".join((
+                "",
+                "=" * 50,
+                "📊 CRYPTO ALERTS DASHBOARD",
+                "=" * 50,
+                "No alerts at this time.",
+                "=" * 50,
+                "",
+                ""
+            )))
             return
         
-        summary = self.get_alert_summary(alerts)
+        summary, high_importance_alerts = self._summarize_alerts(alerts, max_high=10)  # Show top 10
         
-        print("\n" + "="*60)
-        print("📊 CRYPTO ALERTS DASHBOARD")
-        print("="*60)
-        print(f"🔍 Total Alerts: {summary['total_alerts']}")
-        print(f"📈 Golden Crosses: {summary['golden_crosses']}")
-        print(f"📉 Death Crosses: {summary['death_crosses']}")
-        print(f"💼 Unique Symbols: {summary['unique_symbols']}")
-        print(f"🚨 High Priority: {summary['high_importance']}")
-        print(f"⚠️  Medium Priority: {summary['medium_importance']}")
-        print(f"ℹ️  Low Priority: {summary['low_importance']}")
-        print("="*60)
+        lines = [
+            "",
+            _BAR,
+            "📊 CRYPTO ALERTS DASHBOARD",
+            _BAR,
+            f"🔍 Total Alerts: {summary['total_alerts']}",
+            f"📈 Golden Crosses: {summary['golden_crosses']}",
+            f"📉 Death Crosses: {summary['death_crosses']}",
+            f"💼 Unique Symbols: {summary['unique_symbols']}",
+            f"🚨 High Priority: {summary['high_importance']}",
+            f"⚠️  Medium Priority: {summary['medium_importance']}",
+            f"ℹ️  Low Priority: {summary['low_importance']}",
+            _BAR
+        ]
         
         # Show top alerts by importance
-        high_importance_alerts = [a for a in alerts if a['importance'] == 'HIGH']
         if high_importance_alerts:
-            print("\n🚨 HIGH PRIORITY ALERTS:")
-            print("-" * 40)
-            for alert in high_importance_alerts[:10]:  # Show top 10
-                print(f"• {alert['symbol']}: {alert['signal_type']} ({alert['crossover_name']})")
-                print(f"  Price: ${alert['current_price']:.4f}, Strength: {alert['strength']}")
+            lines += ("", "🚨 HIGH PRIORITY ALERTS:", "-" * 40)
+            for alert in high_importance_alerts:
+                lines.append(f"• {alert.symbol}: {alert.signal_type} ({alert.crossover_name})")
+                lines.append(f"  Price: ${alert.current_price:.4f}, Strength: {alert.strength}")
         
-        print("="*60 + "\n")
\ No newline at end of file
+        lines += (_BAR, "", "")
+        sys.stdout.write("\n".join(lines))
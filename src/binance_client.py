@@ -1,14 +1,26 @@
 # Binance API Client for cryptocurrency data retrieval
 import time
+import contextlib
+import heapq
+from http.cookiejar import DefaultCookiePolicy
+from operator import itemgetter
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
 import pandas as pd
+import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from binance.client import Client
 from binance.exceptions import BinanceAPIException, BinanceOrderException
 
 from config.settings import Settings
-from src.utils import setup_logging, retry_on_exception, PerformanceTimer
+from src.utils import setup_logging, retry_on_exception, PerformanceTimer, load_json, timestamps_to_datetime64
+
+# Kline row positions of the numeric columns kept in the DataFrame
+KLINE_PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'quote_asset_volume']
+KLINE_PRICE_FIELDS = [1, 2, 3, 4, 5, 7]
 
 
 class BinanceClient:
@@ -19,6 +31,18 @@ class BinanceClient:
         self.secret_key = secret_key or Settings.BINANCE_SECRET_KEY
         self.logger = setup_logging()
         
+        # Pooled keep-alive session for the direct REST fallbacks. ACCEPT_ENCODING is
+        # urllib3's list of codings it can decode here (adds br when brotli is installed)
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=0))
+        self._session.headers.update({'Connection': 'keep-alive', 'Accept-Encoding': ACCEPT_ENCODING})
+        # Public market-data calls need no cookies; don't carry them between requests
+        self._session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        
+        # exchangeInfo is large and rarely changes: keep a symbol -> info index
+        self._symbol_index: Dict[str, Dict[str, Any]] = {}
+        self._exchange_info_ts = 0.0
+        
         # Initialize Binance client (can work without API keys for public endpoints)
         try:
             if self.api_key and self.secret_key:
@@ -30,6 +54,11 @@ class BinanceClient:
         except Exception as e:
             self.logger.error(f"Failed to initialize Binance client: {e}")
             self.client = None
+        
+        # Ask for compressed responses on python-binance's own session too
+        client_session = getattr(self.client, 'session', None)
+        if client_session is not None:
+            client_session.headers['Accept-Encoding'] = ACCEPT_ENCODING
     
     @retry_on_exception(max_retries=Settings.MAX_RETRIES, delay=Settings.RETRY_DELAY)
     def get_24hr_ticker_stats(self) -> List[Dict[str, Any]]:
@@ -40,9 +69,9 @@ class BinanceClient:
                     tickers = self.client.get_ticker()
                 else:
                     # Fallback to direct API call
-                    response = requests.get('https://api.binance.com/api/v3/ticker/24hr')
+                    response = self._session.get('https://api.binance.com/api/v3/ticker/24hr')
                     response.raise_for_status()
-                    tickers = response.json()
+                    tickers = load_json(response.content)
                 
                 self.logger.info(f"Retrieved {len(tickers)} ticker stats in {timer.elapsed_seconds:.2f}s")
                 return tickers
@@ -67,17 +96,12 @@ class BinanceClient:
                     try:
                         volume = float(ticker.get('quoteVolume', 0))
                         if volume > 0:
-                            usdt_pairs.append({
-                                'symbol': symbol,
-                                'volume': volume,
-                                'price_change_percent': float(ticker.get('priceChangePercent', 0))
-                            })
+                            usdt_pairs.append((symbol, volume))
                     except (ValueError, TypeError):
                         continue
             
-            # Sort by volume and get top symbols
-            usdt_pairs.sort(key=lambda x: x['volume'], reverse=True)
-            top_symbols = [pair['symbol'] for pair in usdt_pairs[:count]]
+            # Top symbols by volume; nlargest with a key keeps the stable-sort tie order
+            top_symbols = [symbol for symbol, _ in heapq.nlargest(count, usdt_pairs, key=itemgetter(1))]
             
             self.logger.info(f"Selected top {len(top_symbols)} symbols by 24hr volume")
             return top_symbols
@@ -88,15 +112,17 @@ class BinanceClient:
     
     @retry_on_exception(max_retries=Settings.MAX_RETRIES, delay=Settings.RETRY_DELAY)
     def get_historical_klines(self, symbol: str, interval: str = Settings.TIMEFRAME, 
-                            days_back: int = Settings.HISTORICAL_DAYS) -> pd.DataFrame:
-        """Get historical kline/candlestick data for a symbol"""
+                            days_back: int = Settings.HISTORICAL_DAYS,
+                            timing: bool = True) -> pd.DataFrame:
+        """Get historical kline/candlestick data for a symbol (timing=False skips the per-call timer)"""
         try:
             # Calculate start date
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days_back)
             start_str = start_date.strftime('%Y-%m-%d')
             
-            with PerformanceTimer(f"Historical data for {symbol}") as timer:
+            timer_cm = PerformanceTimer(f"Historical data for {symbol}") if timing else contextlib.nullcontext()
+            with timer_cm as timer:
                 if self.client:
                     klines = self.client.get_historical_klines(
                         symbol, interval, start_str
@@ -111,37 +137,29 @@ class BinanceClient:
                         'startTime': start_timestamp,
                         'limit': 1000
                     }
-                    response = requests.get(url, params=params)
+                    response = self._session.get(url, params=params)
                     response.raise_for_status()
-                    klines = response.json()
+                    klines = load_json(response.content)
             
             if not klines:
                 self.logger.warning(f"No historical data found for {symbol}")
                 return pd.DataFrame()
             
-            # Convert to DataFrame
-            columns = [
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_timestamp', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ]
-            
-            df = pd.DataFrame(klines, columns=columns)
-            
-            # Convert numeric columns
-            numeric_columns = ['open', 'high', 'low', 'close', 'volume', 'quote_asset_volume']
-            for col in numeric_columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+            # Slice the raw kline rows once with numpy instead of coercing DataFrame columns
+            arr = np.array(klines, dtype=object)
+            df = pd.DataFrame(
+                arr[:, KLINE_PRICE_FIELDS].astype(np.float64),
+                index=pd.DatetimeIndex(timestamps_to_datetime64(arr[:, 0]), name='datetime'),
+                columns=KLINE_PRICE_COLUMNS
+            )
             
-            # Convert timestamp to datetime
-            df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df = df.set_index('datetime')
+            # Binance returns klines in ascending open time; only sort if that ever breaks
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index()
             
-            # Sort by datetime
-            df = df.sort_index()
-            
-            self.logger.debug(f"Retrieved {len(df)} records for {symbol} in {timer.elapsed_seconds:.2f}s")
-            return df[['open', 'high', 'low', 'close', 'volume', 'quote_asset_volume']]
+            if timer is not None:
+                self.logger.debug(f"Retrieved {len(df)} records for {symbol} in {timer.elapsed_seconds:.2f}s")
+            return df
         
         except (BinanceAPIException, requests.RequestException) as e:
             self.logger.error(f"Error fetching historical data for {symbol}: {e}")
@@ -157,7 +175,7 @@ class BinanceClient:
                 ticker = self.client.get_symbol_ticker(symbol=symbol)
                 return float(ticker['price'])
             else:
-                response = requests.get(f'https://api.binance.com/api/v3/ticker/price?symbol={symbol}')
+                response = self._session.get(f'https://api.binance.com/api/v3/ticker/price?symbol={symbol}')
                 response.raise_for_status()
                 data = response.json()
                 return float(data['price'])
@@ -166,22 +184,25 @@ class BinanceClient:
             self.logger.error(f"Error getting current price for {symbol}: {e}")
             return None
     
-    def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get exchange information for a symbol"""
-        try:
+    def _get_symbol_index(self, ttl: float = 3600) -> Dict[str, Dict[str, Any]]:
+        """Symbol -> exchange info index, refetched at most once per ttl seconds"""
+        if not self._symbol_index or time.monotonic() - self._exchange_info_ts > ttl:
             if self.client:
                 exchange_info = self.client.get_exchange_info()
-                for symbol_info in exchange_info['symbols']:
-                    if symbol_info['symbol'] == symbol:
-                        return symbol_info
             else:
-                response = requests.get('https://api.binance.com/api/v3/exchangeInfo')
+                response = self._session.get('https://api.binance.com/api/v3/exchangeInfo')
                 response.raise_for_status()
-                exchange_info = response.json()
-                for symbol_info in exchange_info['symbols']:
-                    if symbol_info['symbol'] == symbol:
-                        return symbol_info
-            return None
+                exchange_info = load_json(response.content)
+            
+            self._symbol_index = {info['symbol']: info for info in exchange_info['symbols']}
+            self._exchange_info_ts = time.monotonic()
+        
+        return self._symbol_index
+    
+    def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Get exchange information for a symbol"""
+        try:
+            return self._get_symbol_index().get(symbol)
         
         except Exception as e:
             self.logger.error(f"Error getting symbol info for {symbol}: {e}")
@@ -189,29 +210,31 @@ class BinanceClient:
     
     def get_multiple_symbols_data(self, symbols: List[str], 
                                  days_back: int = Settings.HISTORICAL_DAYS) -> Dict[str, pd.DataFrame]:
-        """Get historical data for multiple symbols with rate limiting"""
+        """Get historical data for multiple symbols concurrently, bounded by Settings.MAX_CONCURRENCY"""
         results = {}
         total_symbols = len(symbols)
         
         self.logger.info(f"Fetching historical data for {total_symbols} symbols")
         
         with PerformanceTimer(f"Batch data fetch for {total_symbols} symbols") as timer:
-            for i, symbol in enumerate(symbols, 1):
-                try:
-                    df = self.get_historical_klines(symbol, days_back=days_back)
-                    if not df.empty:
-                        results[symbol] = df
-                        self.logger.debug(f"✓ {symbol} ({i}/{total_symbols}) - {len(df)} records")
-                    else:
-                        self.logger.warning(f"✗ {symbol} ({i}/{total_symbols}) - No data")
+            # Bounded concurrency stands in for the old fixed delay between requests
+            with ThreadPoolExecutor(max_workers=max(1, min(Settings.MAX_CONCURRENCY, total_symbols))) as executor:
+                futures = [
+                    executor.submit(self.get_historical_klines, symbol, days_back=days_back, timing=False)
+                    for symbol in symbols
+                ]
+                for i, (symbol, future) in enumerate(zip(symbols, futures), 1):
+                    try:
+                        df = future.result()
+                        if not df.empty:
+                            results[symbol] = df
+                            self.logger.debug(f"✓ {symbol} ({i}/{total_symbols}) - {len(df)} records")
+                        else:
+                            self.logger.warning(f"✗ {symbol} ({i}/{total_symbols}) - No data")
                     
-                    # Rate limiting
-                    if i < total_symbols:  # Don't sleep after the last request
-                        time.sleep(Settings.API_REQUEST_DELAY)
-                
-                except Exception as e:
-                    self.logger.error(f"Failed to fetch data for {symbol}: {e}")
-                    continue
+                    except Exception as e:
+                        self.logger.error(f"Failed to fetch data for {symbol}: {e}")
+                        continue
         
         self.logger.info(f"Successfully fetched data for {len(results)}/{total_symbols} symbols "
                         f"in {timer.elapsed_seconds:.2f}s")
@@ -223,7 +246,7 @@ class BinanceClient:
             if self.client:
                 self.client.ping()
             else:
-                response = requests.get('https://api.binance.com/api/v3/ping')
+                response = self._session.get('https://api.binance.com/api/v3/ping')
                 response.raise_for_status()
             
             self.logger.info("Binance API connection test successful")
@@ -231,4 +254,11 @@ class BinanceClient:
         
         except Exception as e:
             self.logger.error(f"Binance API connection test failed: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def close(self):
+        """Close the pooled HTTP sessions"""
+        self._session.close()
+        client_session = getattr(self.client, 'session', None)
+        if client_session is not None:
+            client_session.close()
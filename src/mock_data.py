@@ -3,7 +3,10 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
-import random
+import zlib
+
+# Unseeded PCG64 generator for draws that need no per-symbol reproducibility
+_rng = np.random.default_rng()
 
 
 class MockDataGenerator:
@@ -40,47 +43,37 @@ class MockDataGenerator:
         dates = pd.date_range(start=start_date, end=end_date, freq='D')
         
         # Generate price data with trend and noise
-        np.random.seed(hash(symbol) % 2**32)  # Consistent seed per symbol
+        rng = np.random.default_rng(zlib.crc32(symbol.encode()))  # Consistent seed per symbol
+        n = len(dates)
         
-        price_changes = np.random.normal(0, 0.02, len(dates))  # 2% daily volatility
+        price_changes = rng.normal(0, 0.02, n)  # 2% daily volatility
         
         # Add some trending behavior
-        trend = np.linspace(-0.1, 0.1, len(dates))  # Slight trend over time
+        trend = np.linspace(-0.1, 0.1, n)  # Slight trend over time
+        
+        growth = 1 + price_changes + trend * 0.1
+        growth[0] = 1.0  # First close is the base price
+        closes = np.maximum(base_price * np.cumprod(growth), base_price * 0.5)  # Floor at 50% of base
+        
+        # Generate realistic OHLC from close price
+        volatility = np.abs(rng.normal(0, 0.01, n))  # Daily volatility
+        opens = np.concatenate((closes[:1], closes[:-1]))
         
-        prices = [base_price]
-        for i, change in enumerate(price_changes[1:], 1):
-            new_price = prices[-1] * (1 + change + trend[i] * 0.1)
-            new_price = max(new_price, base_price * 0.5)  # Floor at 50% of base
-            prices.append(new_price)
+        # Ensure OHLC relationships are valid
+        highs = np.maximum(np.maximum(closes * (1 + volatility), opens), closes)
+        lows = np.minimum(np.minimum(closes * (1 - volatility), opens), closes)
         
-        # Generate OHLCV data
-        data = []
-        for i, (date, close) in enumerate(zip(dates, prices)):
-            # Generate realistic OHLC from close price
-            volatility = abs(np.random.normal(0, 0.01))  # Daily volatility
-            high = close * (1 + volatility)
-            low = close * (1 - volatility)
-            open_price = prices[i-1] if i > 0 else close
-            
-            # Ensure OHLC relationships are valid
-            high = max(high, open_price, close)
-            low = min(low, open_price, close)
-            
-            # Generate volume (more volume on volatile days)
-            base_volume = random.uniform(1000000, 5000000)
-            volume_multiplier = 1 + abs(close - open_price) / open_price
-            volume = base_volume * volume_multiplier
-            
-            data.append({
-                'open': open_price,
-                'high': high,
-                'low': low,
-                'close': close,
-                'volume': volume,
-                'quote_asset_volume': volume * close
-            })
+        # Generate volume (more volume on volatile days)
+        volumes = rng.uniform(1000000, 5000000, n) * (1 + np.abs(closes - opens) / opens)
         
-        df = pd.DataFrame(data, index=dates)
+        df = pd.DataFrame({
+            'open': opens,
+            'high': highs,
+            'low': lows,
+            'close': closes,
+            'volume': volumes,
+            'quote_asset_volume': volumes * closes
+        }, index=dates)
         return df
     
     def get_mock_top_symbols(self, count: int = 10) -> List[str]:
@@ -89,17 +82,21 @@ class MockDataGenerator:
     
     def get_mock_24hr_stats(self) -> List[Dict[str, Any]]:
         """Get mock 24hr ticker statistics"""
-        stats = []
-        for symbol in self.mock_symbols:
-            base_volume = random.uniform(100000000, 1000000000)  # Large volume numbers
-            price_change = random.uniform(-10, 10)  # ±10% change
-            
-            stats.append({
+        n = len(self.mock_symbols)
+        base_volumes = _rng.uniform(100000000, 1000000000, n)  # Large volume numbers
+        price_changes = _rng.uniform(-10, 10, n)  # ±10% change
+        last_prices = _rng.uniform(0.1, 50000, n)
+        
+        stats = [
+            {
                 'symbol': symbol,
-                'quoteVolume': str(base_volume),
-                'priceChangePercent': str(price_change),
-                'lastPrice': str(random.uniform(0.1, 50000))
-            })
+                'quoteVolume': str(float(base_volume)),
+                'priceChangePercent': str(float(price_change)),
+                'lastPrice': str(float(last_price))
+            }
+            for symbol, base_volume, price_change, last_price
+            in zip(self.mock_symbols, base_volumes, price_changes, last_prices)
+        ]
         
         # Sort by volume (descending)
         stats.sort(key=lambda x: float(x['quoteVolume']), reverse=True)
@@ -2,18 +2,51 @@
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 from config.settings import Settings
 from src.utils import setup_logging, PerformanceTimer, calculate_signal_strength
 
 
+def _last_two_valid(values: np.ndarray) -> Optional[Tuple[int, int]]:
+    """Positions of the last two non-NaN values, or None if there are fewer than two"""
+    n = len(values)
+    if n >= 2 and not (np.isnan(values[-1]) or np.isnan(values[-2])):
+        return n - 2, n - 1  # Common case: the series is complete at its tail
+    
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) < 2:
+        return None
+    return int(valid[-2]), int(valid[-1])
+
+
+_MISSING_NS = np.iinfo(np.int64).min
+
+
+def _timestamp_ns(timestamp: Any) -> int:
+    """Timestamp (pandas, datetime or string) as int64 ns; missing values sort before any cutoff"""
+    if not timestamp:
+        return _MISSING_NS
+    if not isinstance(timestamp, pd.Timestamp):
+        timestamp = pd.Timestamp(timestamp)
+    return _MISSING_NS if timestamp is pd.NaT else timestamp.value
+
+
 class SignalDetector:
     """Detect trading signals from moving average crossovers"""
     
+    _STRENGTH_POINTS = {'STRONG': 3, 'MEDIUM': 2, 'WEAK': 1}
+    
     def __init__(self):
         self.logger = setup_logging()
         self.crossover_types = Settings.CROSSOVER_TYPES
+        # (fast, slow, ma_type, fast_col, slow_col, crossover_name) per config, built once
+        self._pairs = tuple(
+            (c['fast'], c['slow'], c['type'],
+             f"{c['type']}_{c['fast']}", f"{c['type']}_{c['slow']}", f"{c['type']}_{c['fast']}_{c['slow']}")
+            for c in self.crossover_types
+        )
     
     def detect_crossover(self, fast_ma: pd.Series, slow_ma: pd.Series, 
                         lookback_periods: int = 3) -> Optional[Dict[str, Any]]:
@@ -21,18 +54,17 @@ class SignalDetector:
         if len(fast_ma) < lookback_periods + 1 or len(slow_ma) < lookback_periods + 1:
             return None
         
-        # Align the series
-        aligned_fast = fast_ma.dropna()
-        aligned_slow = slow_ma.dropna()
+        # Last two non-NaN points of each series, read straight from the arrays
+        fast = fast_ma.to_numpy(dtype=np.float64)
+        slow = slow_ma.to_numpy(dtype=np.float64)
+        fast_idx = _last_two_valid(fast)
+        slow_idx = _last_two_valid(slow)
         
-        if len(aligned_fast) < 2 or len(aligned_slow) < 2:
+        if fast_idx is None or slow_idx is None:
             return None
         
-        # Get recent values for crossover detection
-        current_fast = aligned_fast.iloc[-1]
-        current_slow = aligned_slow.iloc[-1]
-        prev_fast = aligned_fast.iloc[-2]
-        prev_slow = aligned_slow.iloc[-2]
+        prev_fast, current_fast = fast[fast_idx[0]], fast[fast_idx[1]]
+        prev_slow, current_slow = slow[slow_idx[0]], slow[slow_idx[1]]
         
         # Check for crossover
         crossover_type = None
@@ -43,20 +75,25 @@ class SignalDetector:
             crossover_type = "DEATH_CROSS"   # Bearish crossover
         
         if crossover_type:
-            signal_strength = calculate_signal_strength(current_fast, current_slow)
-            
-            return {
-                'type': crossover_type,
-                'timestamp': aligned_fast.index[-1],
-                'fast_ma_value': float(current_fast),
-                'slow_ma_value': float(current_slow),
-                'strength': signal_strength['strength'],
-                'percentage_diff': signal_strength['percentage_diff'],
-                'direction': signal_strength['direction']
-            }
+            return self._build_crossover(crossover_type, fast_ma.index[fast_idx[1]], current_fast, current_slow)
         
         return None
     
+    def _build_crossover(self, crossover_type: str, timestamp, current_fast: float,
+                         current_slow: float) -> Dict[str, Any]:
+        """Crossover record for the bar at timestamp"""
+        signal_strength = calculate_signal_strength(current_fast, current_slow)
+        
+        return {
+            'type': crossover_type,
+            'timestamp': timestamp,
+            'fast_ma_value': float(current_fast),
+            'slow_ma_value': float(current_slow),
+            'strength': signal_strength['strength'],
+            'percentage_diff': signal_strength['percentage_diff'],
+            'direction': signal_strength['direction']
+        }
+    
     def analyze_symbol_crossovers(self, symbol: str, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Analyze all configured crossovers for a single symbol"""
         crossovers = []
@@ -64,27 +101,48 @@ class SignalDetector:
         if df.empty:
             return crossovers
         
-        for crossover_config in self.crossover_types:
-            fast_period = crossover_config['fast']
-            slow_period = crossover_config['slow']
-            ma_type = crossover_config['type']
-            
-            fast_col = f'{ma_type}_{fast_period}'
-            slow_col = f'{ma_type}_{slow_period}'
-            
-            if fast_col not in df.columns or slow_col not in df.columns:
-                continue
+        # Configured pairs whose MA columns are present
+        columns_present = df.columns
+        pairs = [pair for pair in self._pairs if pair[3] in columns_present and pair[4] in columns_present]
+        
+        if not pairs or len(df) < 4:  # detect_crossover's default lookback + 1
+            return crossovers
+        
+        # Last two bars of every MA column at once, then all pairs in one vector test
+        columns = list(dict.fromkeys(col for pair in pairs for col in (pair[3], pair[4])))
+        position = {col: i for i, col in enumerate(columns)}
+        tail = df[columns].iloc[-2:].to_numpy(dtype=np.float64)
+        fast_tail = tail[:, [position[pair[3]] for pair in pairs]]
+        slow_tail = tail[:, [position[pair[4]] for pair in pairs]]
+        
+        complete = ~(np.isnan(fast_tail).any(axis=0) | np.isnan(slow_tail).any(axis=0))
+        golden = complete & (fast_tail[0] <= slow_tail[0]) & (fast_tail[1] > slow_tail[1])
+        death = complete & ~golden & (fast_tail[0] >= slow_tail[0]) & (fast_tail[1] < slow_tail[1])
+        
+        build, detect = self._build_crossover, self.detect_crossover
+        close_last = None
+        for k in np.flatnonzero(golden | death | ~complete):
+            fast_period, slow_period, ma_type, fast_col, slow_col, crossover_name = pairs[k]
             
-            crossover = self.detect_crossover(df[fast_col], df[slow_col])
+            if complete[k]:
+                crossover = build(
+                    'GOLDEN_CROSS' if golden[k] else 'DEATH_CROSS',
+                    df.index[-1], fast_tail[1, k], slow_tail[1, k]
+                )
+            else:
+                # NaN in the last two bars: let detect_crossover find the last valid points
+                crossover = detect(df[fast_col], df[slow_col])
             
             if crossover:
+                if close_last is None:
+                    close_last = float(df['close'].iat[-1])
                 crossover.update({
                     'symbol': symbol,
                     'fast_period': fast_period,
                     'slow_period': slow_period,
                     'ma_type': ma_type,
-                    'crossover_name': f'{ma_type}_{fast_period}_{slow_period}',
-                    'current_price': float(df['close'].iloc[-1])
+                    'crossover_name': crossover_name,
+                    'current_price': close_last
                 })
                 crossovers.append(crossover)
         
@@ -97,17 +155,20 @@ class SignalDetector:
         
         self.logger.info(f"Detecting crossovers for {total_symbols} symbols")
         
+        analyze, ensure_importance, logger = self.analyze_symbol_crossovers, self._ensure_importance, self.logger
         with PerformanceTimer(f"Crossover detection for {total_symbols} symbols") as timer:
             for i, (symbol, df) in enumerate(symbol_data.items(), 1):
                 try:
-                    symbol_crossovers = self.analyze_symbol_crossovers(symbol, df)
+                    symbol_crossovers = analyze(symbol, df)
+                    for crossover in symbol_crossovers:
+                        ensure_importance(crossover)
                     all_crossovers.extend(symbol_crossovers)
                     
                     if symbol_crossovers:
-                        self.logger.debug(f"Found {len(symbol_crossovers)} crossovers for {symbol}")
+                        logger.debug(f"Found {len(symbol_crossovers)} crossovers for {symbol}")
                 
                 except Exception as e:
-                    self.logger.error(f"Error detecting crossovers for {symbol}: {e}")
+                    logger.error(f"Error detecting crossovers for {symbol}: {e}")
                     continue
         
         self.logger.info(f"Found {len(all_crossovers)} total crossovers in {timer.elapsed_seconds:.2f}s")
@@ -133,12 +194,7 @@ class SignalDetector:
             importance_score += 1
         
         # Signal strength importance
-        if strength == 'STRONG':
-            importance_score += 3
-        elif strength == 'MEDIUM':
-            importance_score += 2
-        elif strength == 'WEAK':
-            importance_score += 1
+        importance_score += self._STRENGTH_POINTS.get(strength, 0)
         
         # EMA crossovers are generally considered more responsive
         if ma_type == 'EMA':
@@ -158,26 +214,25 @@ class SignalDetector:
         else:
             return 'LOW'
     
+    def _ensure_importance(self, crossover: Dict[str, Any]) -> str:
+        """Classify a crossover once and keep the result on it"""
+        importance = crossover.get('importance')
+        if importance is None:
+            importance = crossover['importance'] = self.classify_signal_importance(crossover)
+        return importance
+    
     def filter_recent_crossovers(self, crossovers: List[Dict[str, Any]], 
                                 hours_back: int = 24) -> List[Dict[str, Any]]:
         """Filter crossovers that occurred within the specified time window"""
         if not crossovers:
             return []
         
-        cutoff_time = datetime.now() - timedelta(hours=hours_back)
-        recent_crossovers = []
-        
-        for crossover in crossovers:
-            crossover_time = crossover.get('timestamp')
-            if isinstance(crossover_time, pd.Timestamp):
-                crossover_time = crossover_time.to_pydatetime()
-            elif isinstance(crossover_time, str):
-                crossover_time = pd.to_datetime(crossover_time).to_pydatetime()
-            
-            if crossover_time and crossover_time >= cutoff_time:
-                recent_crossovers.append(crossover)
+        # Compare int64 ns stamps; naive times stay naive on both sides, as before
+        cutoff_ns = pd.Timestamp(datetime.now() - timedelta(hours=hours_back)).value
+        stamps = np.fromiter((_timestamp_ns(crossover.get('timestamp')) for crossover in crossovers),
+                             dtype=np.int64, count=len(crossovers))
         
-        return recent_crossovers
+        return [crossovers[i] for i in np.flatnonzero(stamps >= cutoff_ns)]
     
     def get_signal_statistics(self, crossovers: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate statistics about detected signals"""
@@ -213,7 +268,7 @@ class SignalDetector:
                 stats['death_crosses'] += 1
             
             # Count importance levels
-            importance = self.classify_signal_importance(crossover)
+            importance = self._ensure_importance(crossover)
             if importance == 'HIGH':
                 stats['high_importance'] += 1
             elif importance == 'MEDIUM':
@@ -241,9 +296,9 @@ class SignalDetector:
         if not crossovers:
             return []
         
-        # Add importance classification to each crossover
+        # Add importance classification to each crossover (kept if already classified)
         for crossover in crossovers:
-            crossover['importance'] = self.classify_signal_importance(crossover)
+            self._ensure_importance(crossover)
         
         # Sort by importance (HIGH > MEDIUM > LOW) and then by percentage_diff
         importance_order = {'HIGH': 3, 'MEDIUM': 2, 'LOW': 1}
@@ -259,40 +314,40 @@ class SignalDetector:
         
         return sorted_crossovers
     
-    def detect_multiple_timeframe_confluence(self, symbol_data: Dict[str, pd.DataFrame]) -> List[Dict[str, Any]]:
-        """Detect confluence when multiple timeframes/MAs show similar signals"""
+    def detect_multiple_timeframe_confluence(self, all_crossovers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Detect confluence when multiple timeframes/MAs show similar signals
+        
+        Takes the crossovers already found by detect_all_crossovers instead of re-analyzing the data.
+        """
         confluence_signals = []
         
-        # Group crossovers by symbol
-        symbol_crossovers = {}
-        for symbol, df in symbol_data.items():
-            crossovers = self.analyze_symbol_crossovers(symbol, df)
-            if crossovers:
-                symbol_crossovers[symbol] = crossovers
-        
-        # Look for confluence (multiple signals for the same symbol)
-        for symbol, crossovers in symbol_crossovers.items():
-            if len(crossovers) >= 2:
-                # Check if signals are in the same direction
-                golden_crosses = [c for c in crossovers if c['type'] == 'GOLDEN_CROSS']
-                death_crosses = [c for c in crossovers if c['type'] == 'DEATH_CROSS']
-                
-                if len(golden_crosses) >= 2:
-                    confluence_signals.append({
-                        'symbol': symbol,
-                        'confluence_type': 'BULLISH',
-                        'signal_count': len(golden_crosses),
-                        'signals': golden_crosses,
-                        'avg_strength': np.mean([c['percentage_diff'] for c in golden_crosses])
-                    })
-                
-                if len(death_crosses) >= 2:
-                    confluence_signals.append({
-                        'symbol': symbol,
-                        'confluence_type': 'BEARISH',
-                        'signal_count': len(death_crosses),
-                        'signals': death_crosses,
-                        'avg_strength': np.mean([c['percentage_diff'] for c in death_crosses])
-                    })
+        # Group crossovers by symbol and direction in one pass
+        symbol_crossovers = defaultdict(lambda: ([], []))
+        for crossover in all_crossovers:
+            golden_crosses, death_crosses = symbol_crossovers[crossover['symbol']]
+            if crossover['type'] == 'GOLDEN_CROSS':
+                golden_crosses.append(crossover)
+            elif crossover['type'] == 'DEATH_CROSS':
+                death_crosses.append(crossover)
+        
+        # Look for confluence (multiple signals in the same direction for the same symbol)
+        for symbol, (golden_crosses, death_crosses) in symbol_crossovers.items():
+            if len(golden_crosses) >= 2:
+                confluence_signals.append({
+                    'symbol': symbol,
+                    'confluence_type': 'BULLISH',
+                    'signal_count': len(golden_crosses),
+                    'signals': golden_crosses,
+                    'avg_strength': np.mean([c['percentage_diff'] for c in golden_crosses])
+                })
+            
+            if len(death_crosses) >= 2:
+                confluence_signals.append({
+                    'symbol': symbol,
+                    'confluence_type': 'BEARISH',
+                    'signal_count': len(death_crosses),
+                    'signals': death_crosses,
+                    'avg_strength': np.mean([c['percentage_diff'] for c in death_crosses])
+                })
         
         return confluence_signals
\ No newline at end of file
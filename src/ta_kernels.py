@@ -0,0 +1,56 @@
+# Array kernels for moving averages over every configured period at once
+import pandas as pd
+import numpy as np
+from typing import Sequence, Tuple
+from functools import lru_cache
+
+try:
+    from scipy.signal import lfilter
+except ImportError:  # pandas ewm fallback
+    lfilter = None
+
+
+def sma_multi(close: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+    """SMAs for all periods along the last axis of close (n or symbols x n); out[j] is periods[j], NaN before a full window"""
+    n = close.shape[-1]
+    out = np.full((len(periods),) + close.shape, np.nan)
+    if n == 0:
+        return out
+
+    # Centre on the first close so the running sum stays small (flat prices stay exact)
+    base = close[..., :1]
+    csum = np.zeros(close.shape[:-1] + (n + 1,))
+    np.cumsum(close - base, axis=-1, out=csum[..., 1:])
+
+    for j, period in enumerate(periods):
+        if period <= n:
+            out[j, ..., period - 1:] = (csum[..., period:] - csum[..., :-period]) / period + base
+
+    return out
+
+
+def ema_gap_free(close: np.ndarray, period: int) -> np.ndarray:
+    """EMA (span=period, adjust=False) along the last axis of a NaN-free close array"""
+    if lfilter is None or close.shape[-1] == 0:
+        frame = pd.DataFrame(close.reshape(-1, close.shape[-1]).T, copy=False)
+        return frame.ewm(span=period, adjust=False).mean().to_numpy().T.reshape(close.shape)
+
+    # y[t] = alpha * x[t] + (1 - alpha) * y[t-1], seeded so that y[0] = x[0]
+    b, a = _ema_filter(period)
+    return lfilter(b, a, close, axis=-1, zi=-a[1] * close[..., :1])[0]
+
+
+@lru_cache(maxsize=None)
+def _ema_filter(period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """lfilter (b, a) coefficients for an EMA with span=period, built once per period"""
+    alpha = 2.0 / (period + 1)
+    return np.array([alpha]), np.array([1.0, alpha - 1.0])
+
+
+def ema_multi(close: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+    """EMAs (span=period, adjust=False) for all periods along the last axis of a NaN-free close; out[j] is periods[j]"""
+    out = np.empty((len(periods),) + close.shape)
+    for j, period in enumerate(periods):
+        out[j] = ema_gap_free(close, period)
+
+    return out
@@ -1,11 +1,27 @@
 # Technical Analysis calculations for moving averages
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 from config.settings import Settings
 from src.utils import setup_logging, PerformanceTimer
+from src.ta_kernels import sma_multi, ema_multi, ema_gap_free, lfilter
+
+try:
+    import bottleneck as bn
+except ImportError:  # pandas rolling fallback
+    bn = None
+
+SQRT_252 = np.sqrt(252)  # trading days per year, for annualizing volatility
+
+
+def _slope_weights(periods: int) -> np.ndarray:
+    """Least-squares slope over x = 0..periods-1 in closed form: slope = y @ weights"""
+    x = np.arange(periods, dtype=np.float64)
+    x -= x.mean()
+    return x / (x @ x)
 
 
 class TechnicalAnalysis:
@@ -14,6 +30,21 @@ class TechnicalAnalysis:
     def __init__(self):
         self.logger = setup_logging()
         self.ma_periods = Settings.MA_PERIODS
+        # Column names and pair keys for the fixed MA_PERIODS, built once
+        self._sma_columns = [f'SMA_{period}' for period in self.ma_periods]
+        self._ema_columns = [f'EMA_{period}' for period in self.ma_periods]
+        self._ma_columns = [col for pair in zip(self._sma_columns, self._ema_columns) for col in pair]
+        
+        # (fast, slow) index pairs into ma_periods, fast before slow, and their result keys per type
+        self._pair_idx = np.triu_indices(len(self.ma_periods), k=1)
+        self._pair_keys = [
+            (k, t, f'{ma_type}_{self.ma_periods[i]}_{ma_type}_{self.ma_periods[j]}_diff')
+            for k, (i, j) in enumerate(zip(*self._pair_idx))
+            for t, ma_type in enumerate(['SMA', 'EMA'])
+        ]
+        
+        # Slope weights per lookback length, seeded with calculate_ma_slopes' default
+        self._slope_weights = {5: _slope_weights(5)}
     
     def calculate_sma(self, data: pd.Series, period: int) -> pd.Series:
         """Calculate Simple Moving Average"""
@@ -21,6 +52,11 @@ class TechnicalAnalysis:
             self.logger.warning(f"Insufficient data for SMA {period}: {len(data)} < {period}")
             return pd.Series(index=data.index, dtype=float)
         
+        if bn is not None:
+            # Same NaN rule as min_periods=period, straight on the ndarray
+            return pd.Series(bn.move_mean(data.to_numpy(dtype=np.float64), period, min_count=period),
+                             index=data.index, name=data.name)
+        
         return data.rolling(window=period, min_periods=period).mean()
     
     def calculate_ema(self, data: pd.Series, period: int) -> pd.Series:
@@ -29,6 +65,12 @@ class TechnicalAnalysis:
             self.logger.warning(f"Insufficient data for EMA {period}: {len(data)} < {period}")
             return pd.Series(index=data.index, dtype=float)
         
+        if lfilter is not None:
+            values = data.to_numpy(dtype=np.float64)
+            # lfilter would carry a NaN forward; ewm skips over gaps
+            if not np.isnan(values).any():
+                return pd.Series(ema_gap_free(values, period), index=data.index, name=data.name)
+        
         return data.ewm(span=period, adjust=False).mean()
     
     def calculate_all_moving_averages(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -37,18 +79,66 @@ class TechnicalAnalysis:
             self.logger.error("Invalid DataFrame for moving average calculation")
             return df
         
-        result_df = df.copy()
         close_prices = df['close']
+        close = close_prices.to_numpy(dtype=np.float64)
+        
+        if np.isnan(close).any():
+            # Gaps need pandas' window NaN handling; keep the per-period path
+            ma_values = np.empty((len(close), 2 * len(self.ma_periods)))
+            for j, period in enumerate(self.ma_periods):
+                ma_values[:, 2 * j] = self.calculate_sma(close_prices, period).to_numpy()
+                ma_values[:, 2 * j + 1] = self.calculate_ema(close_prices, period).to_numpy()
+            return self._join_ma_columns(df, ma_values)
+        
+        # All periods from shared passes over close
+        return self._with_moving_averages(df, sma_multi(close, self.ma_periods), ema_multi(close, self.ma_periods))
+    
+    def _with_moving_averages(self, df: pd.DataFrame, sma_values: np.ndarray, 
+                              ema_values: np.ndarray) -> pd.DataFrame:
+        """df plus precomputed SMA/EMA rows (one per configured period) as columns"""
+        n = len(df)
+        # Interleaved SMA_p, EMA_p columns, matching self._ma_columns
+        ma_values = np.empty((n, 2 * len(self.ma_periods)))
+        ma_values[:, 0::2] = sma_values.T
+        ma_values[:, 1::2] = ema_values.T
+        for j, period in enumerate(self.ma_periods):
+            if n < period:
+                self.logger.warning(f"Insufficient data for SMA {period}: {n} < {period}")
+                self.logger.warning(f"Insufficient data for EMA {period}: {n} < {period}")
+                ma_values[:, 2 * j + 1] = np.nan
+        
+        return self._join_ma_columns(df, ma_values)
+    
+    def _join_ma_columns(self, df: pd.DataFrame, ma_values: np.ndarray) -> pd.DataFrame:
+        """New frame: df's columns (shared, not copied) followed by the MA columns as one block"""
+        if df.columns.isin(self._ma_columns).any():
+            # Recomputing on a frame that already has MA columns: overwrite them in place
+            return df.assign(**dict(zip(self._ma_columns, ma_values.T)))
         
-        # Calculate SMAs
-        for period in self.ma_periods:
-            sma_col = f'SMA_{period}'
-            ema_col = f'EMA_{period}'
-            
-            result_df[sma_col] = self.calculate_sma(close_prices, period)
-            result_df[ema_col] = self.calculate_ema(close_prices, period)
-        
-        return result_df
+        return pd.concat([df, pd.DataFrame(ma_values, index=df.index, columns=self._ma_columns)], axis=1)
+    
+    def _batch_moving_averages(self, symbol_data: Dict[str, pd.DataFrame]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """SMA/EMA arrays per symbol, computed as one 2D batch per series length (gap-free closes only)"""
+        by_length: Dict[int, List[Tuple[str, np.ndarray]]] = {}
+        for symbol, df in symbol_data.items():
+            if df.empty or 'close' not in df.columns:
+                continue
+            try:
+                close = df['close'].to_numpy(dtype=np.float64)
+            except (TypeError, ValueError):
+                continue
+            if not np.isnan(close).any():
+                by_length.setdefault(len(close), []).append((symbol, close))
+        
+        batched = {}
+        for members in by_length.values():
+            closes = np.vstack([close for _, close in members])
+            sma_values = sma_multi(closes, self.ma_periods)
+            ema_values = ema_multi(closes, self.ma_periods)
+            for i, (symbol, _) in enumerate(members):
+                batched[symbol] = (sma_values[:, i], ema_values[:, i])
+        
+        return batched
     
     def calculate_moving_average_data(self, symbol_data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
         """Calculate moving averages for multiple symbols"""
@@ -58,9 +148,14 @@ class TechnicalAnalysis:
         self.logger.info(f"Calculating moving averages for {total_symbols} symbols")
         
         with PerformanceTimer(f"MA calculations for {total_symbols} symbols") as timer:
+            batched = self._batch_moving_averages(symbol_data)
+            
             for i, (symbol, df) in enumerate(symbol_data.items(), 1):
                 try:
-                    ma_df = self.calculate_all_moving_averages(df)
+                    if symbol in batched:
+                        ma_df = self._with_moving_averages(df, *batched[symbol])
+                    else:
+                        ma_df = self.calculate_all_moving_averages(df)
                     results[symbol] = ma_df
                     
                     # Log progress for every 10 symbols
@@ -87,16 +182,15 @@ class TechnicalAnalysis:
             'volume': float(latest_data.get('volume', 0)),
         }
         
-        # Add moving average values
-        for period in self.ma_periods:
-            sma_col = f'SMA_{period}'
-            ema_col = f'EMA_{period}'
-            
-            if sma_col in df.columns:
-                result[sma_col] = float(latest_data[sma_col]) if pd.notna(latest_data[sma_col]) else None
-            
-            if ema_col in df.columns:
-                result[ema_col] = float(latest_data[ema_col]) if pd.notna(latest_data[ema_col]) else None
+        # Add moving average values, NaN as None, from one array read of the row
+        column_pos = {col: pos for pos, col in enumerate(df.columns)}
+        ma_columns = [col for col in self._ma_columns if col in column_pos]
+        if ma_columns:
+            ma_values = latest_data.to_numpy()[[column_pos[col] for col in ma_columns]].astype(np.float64)
+            result.update({
+                col: None if missing else value
+                for col, value, missing in zip(ma_columns, ma_values.tolist(), np.isnan(ma_values).tolist())
+            })
         
         return result
     
@@ -107,17 +201,26 @@ class TechnicalAnalysis:
         if len(df) < periods + max(self.ma_periods):
             return slopes
         
-        for period in self.ma_periods:
-            for ma_type in ['SMA', 'EMA']:
-                col_name = f'{ma_type}_{period}'
-                if col_name in df.columns:
-                    ma_series = df[col_name].dropna()
-                    if len(ma_series) >= periods:
-                        # Calculate slope using linear regression over last 'periods' data points
-                        recent_values = ma_series.tail(periods).values
-                        x = np.arange(len(recent_values))
-                        slope = np.polyfit(x, recent_values, 1)[0]
-                        slopes[col_name] = slope
+        weights = self._slope_weights.get(periods)
+        if weights is None:
+            weights = self._slope_weights[periods] = _slope_weights(periods)
+        
+        columns = [col for col in self._ma_columns if col in df.columns]
+        if not columns:
+            return slopes
+        
+        # Gap-free tails share one matrix-vector product; others take their last valid points
+        tails = df[columns].iloc[-periods:].to_numpy(dtype=np.float64)
+        complete = ~np.isnan(tails).any(axis=0)
+        tail_slopes = weights @ tails
+        
+        for k, col_name in enumerate(columns):
+            if complete[k]:
+                slopes[col_name] = tail_slopes[k]
+            else:
+                ma_series = df[col_name].dropna()
+                if len(ma_series) >= periods:
+                    slopes[col_name] = ma_series.to_numpy(dtype=np.float64)[-periods:] @ weights
         
         return slopes
     
@@ -126,28 +229,30 @@ class TechnicalAnalysis:
         if df.empty or len(df) < max(self.ma_periods):
             return {}
         
-        latest_row = df.iloc[-1]
-        analysis = {}
+        # Latest value of every MA (NaN when absent): SMA row, EMA row, columns in period order
+        column_pos = {col: pos for pos, col in enumerate(df.columns)}
+        positions = np.array([column_pos.get(col, -1) for col in self._sma_columns + self._ema_columns])
+        latest_row = df.iloc[-1].to_numpy()[positions]
+        latest_row[positions < 0] = np.nan
+        latest = latest_row.astype(np.float64).reshape(2, len(self.ma_periods))
+        
+        # Every fast/slow pair at once: fast index i < slow index j
+        fast_idx, slow_idx = self._pair_idx
+        fast_vals = latest[:, fast_idx]
+        slow_vals = latest[:, slow_idx]
+        valid = ~(np.isnan(fast_vals) | np.isnan(slow_vals)) & (slow_vals != 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            diff_percent = ((fast_vals - slow_vals) / slow_vals) * 100
+        fast_above_slow = fast_vals > slow_vals
         
-        # Compare different MA pairs
-        for i, fast_period in enumerate(self.ma_periods[:-1]):
-            for slow_period in self.ma_periods[i+1:]:
-                for ma_type in ['SMA', 'EMA']:
-                    fast_ma = f'{ma_type}_{fast_period}'
-                    slow_ma = f'{ma_type}_{slow_period}'
-                    
-                    if fast_ma in df.columns and slow_ma in df.columns:
-                        fast_val = latest_row[fast_ma]
-                        slow_val = latest_row[slow_ma]
-                        
-                        if pd.notna(fast_val) and pd.notna(slow_val) and slow_val != 0:
-                            diff_percent = ((fast_val - slow_val) / slow_val) * 100
-                            
-                            analysis[f'{fast_ma}_{slow_ma}_diff'] = {
-                                'percentage_diff': diff_percent,
-                                'fast_above_slow': fast_val > slow_val,
-                                'convergence_strength': abs(diff_percent)
-                            }
+        analysis = {}
+        for k, t, key in self._pair_keys:
+            if valid[t, k]:
+                analysis[key] = {
+                    'percentage_diff': diff_percent[t, k],
+                    'fast_above_slow': fast_above_slow[t, k],
+                    'convergence_strength': abs(diff_percent[t, k])
+                }
         
         return analysis
     
@@ -156,29 +261,40 @@ class TechnicalAnalysis:
         if len(df) < period or 'close' not in df.columns:
             return 0.0
         
+        # Only the last window of returns matters: period + 1 closes
+        tail = df['close'].to_numpy(dtype=np.float64)[-(period + 1):]
+        if len(tail) == period + 1 and not np.isnan(tail).any():
+            returns = np.diff(tail) / tail[:-1]
+            return float(returns.std(ddof=1) * SQRT_252)  # Annualized
+        
+        # Gaps in the tail: last window of the NaN-free return series
         returns = df['close'].pct_change().dropna()
         if len(returns) < period:
             return 0.0
         
-        return float(returns.rolling(window=period).std().iloc[-1] * np.sqrt(252))  # Annualized
+        return float(returns.rolling(window=period).std().iloc[-1] * SQRT_252)  # Annualized
     
     def get_support_resistance_levels(self, df: pd.DataFrame, window: int = 20) -> Dict[str, float]:
         """Identify potential support and resistance levels"""
         if len(df) < window:
             return {}
         
-        recent_data = df.tail(window * 2)  # Use more data for better analysis
-        
-        # Simple support/resistance based on recent highs and lows
-        resistance = float(recent_data['high'].max())
-        support = float(recent_data['low'].min())
+        start = len(df) - min(len(df), window * 2)  # Use more data for better analysis
+        high = df['high'].to_numpy(dtype=np.float64)[start:]
+        low = df['low'].to_numpy(dtype=np.float64)[start:]
         
-        # More sophisticated approach using local maxima/minima
-        highs = recent_data['high'].rolling(window=5, center=True).max()
-        lows = recent_data['low'].rolling(window=5, center=True).min()
+        # Simple support/resistance based on recent highs and lows (NaN-skipping like Series.max/min)
+        resistance = float(np.fmax.reduce(high, initial=np.nan))
+        support = float(np.fmin.reduce(low, initial=np.nan))
         
-        local_highs = recent_data[recent_data['high'] == highs]['high'].values
-        local_lows = recent_data[recent_data['low'] == lows]['low'].values
+        # More sophisticated approach using local maxima/minima: bars equal to their centred
+        # 5-bar max/min; edge bars lack a full window and never qualify, as with rolling(center=True)
+        if len(high) >= 5:
+            inner = slice(2, len(high) - 2)
+            local_highs = high[inner][high[inner] == sliding_window_view(high, 5).max(axis=1)]
+            local_lows = low[inner][low[inner] == sliding_window_view(low, 5).min(axis=1)]
+        else:
+            local_highs = local_lows = np.empty(0)
         
         return {
             'resistance': resistance,
@@ -223,23 +339,30 @@ class TechnicalAnalysis:
                       output_file: str) -> bool:
         """Export moving average data to CSV"""
         try:
-            all_data = []
-            
-            for symbol, df in symbol_data.items():
-                if df.empty:
-                    continue
-                
-                df_copy = df.copy()
-                df_copy['symbol'] = symbol
-                df_copy['date'] = df_copy.index.date
-                all_data.append(df_copy)
+            frames = [(symbol, df) for symbol, df in symbol_data.items() if not df.empty]
             
-            if not all_data:
+            if not frames:
                 self.logger.warning("No data to export")
                 return False
             
-            combined_df = pd.concat(all_data, ignore_index=False)
-            combined_df.to_csv(output_file)
+            # Same header and row order a concat of all frames would give, streamed per symbol
+            columns = list(dict.fromkeys(
+                col for _, df in frames for col in (*df.columns, 'symbol', 'date')
+            ))
+            index_names = {df.index.name for _, df in frames}
+            index_label = index_names.pop() if len(index_names) == 1 else ''
+            
+            with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as fh:
+                for i, (symbol, df) in enumerate(frames):
+                    # assign() shares df's blocks under copy-on-write instead of copying them;
+                    # symbol as a one-category column, date as datetime64 midnights (naive index)
+                    frame = df.assign(
+                        symbol=pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=[symbol]),
+                        date=df.index.normalize() if df.index.tz is None else df.index.date
+                    )
+                    if list(frame.columns) != columns:
+                        frame = frame.reindex(columns=columns)
+                    frame.to_csv(fh, header=i == 0, index_label=index_label)
             
             self.logger.info(f"Exported MA data to {output_file}")
             return True
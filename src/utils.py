@@ -1,13 +1,25 @@
 # Utility functions for the Binance Crypto Alerts system
+import asyncio
+import dataclasses
+import inspect
+import json
 import logging
 import time
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
-from functools import wraps
+from functools import lru_cache, wraps
 
+import numpy as np
 
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
+
+
+@lru_cache(maxsize=8)
 def setup_logging(log_level: str = 'INFO', log_file: str = None) -> logging.Logger:
-    """Setup logging configuration"""
+    """Setup logging configuration (memoized per (log_level, log_file); the logger is a per-name singleton)"""
     logger = logging.getLogger('binance_crypto_alerts')
     logger.setLevel(getattr(logging, log_level.upper()))
     
@@ -34,8 +46,26 @@ def setup_logging(log_level: str = 'INFO', log_file: str = None) -> logging.Logg
 
 
 def retry_on_exception(max_retries: int = 3, delay: float = 1.0, exceptions: tuple = (Exception,)):
-    """Decorator for retrying functions on specific exceptions"""
+    """Decorator for retrying functions on specific exceptions (coroutine functions back off with asyncio.sleep)"""
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                last_exception = None
+                for attempt in range(max_retries + 1):
+                    try:
+                        return await func(*args, **kwargs)
+                    except exceptions as e:
+                        last_exception = e
+                        if attempt < max_retries:
+                            # Yield to the event loop so other fetches proceed during backoff
+                            await asyncio.sleep(delay * (2 ** attempt))
+                            continue
+                        else:
+                            raise last_exception
+                return None
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             last_exception = None
@@ -75,9 +105,18 @@ def format_large_number(number: float) -> str:
 
 def timestamp_to_datetime(timestamp: int) -> datetime:
     """Convert timestamp to datetime object"""
+    if isinstance(timestamp, int):
+        # Whole seconds plus exact milliseconds, no float division
+        seconds, millis = divmod(timestamp, 1000)
+        return datetime.fromtimestamp(seconds).replace(microsecond=millis * 1000)
     return datetime.fromtimestamp(timestamp / 1000)
 
 
+def timestamps_to_datetime64(timestamps) -> np.ndarray:
+    """Convert millisecond timestamps in bulk to a datetime64[ms] array (a view for int64 input)"""
+    return np.asarray(timestamps, dtype=np.int64).view('datetime64[ms]')
+
+
 def datetime_to_timestamp(dt: datetime) -> int:
     """Convert datetime to timestamp"""
     return int(dt.timestamp() * 1000)
@@ -94,6 +133,12 @@ def validate_symbol(symbol: str) -> bool:
     """Validate cryptocurrency symbol format"""
     if not symbol or not isinstance(symbol, str):
         return False
+    return _validate_symbol_str(symbol)
+
+
+@lru_cache(maxsize=4096)
+def _validate_symbol_str(symbol: str) -> bool:
+    """Format check for a non-empty string, memoized over the (small) symbol universe"""
     return len(symbol) >= 3 and symbol.isalpha() or symbol.endswith('USDT')
 
 
@@ -139,6 +184,31 @@ def clean_symbol_data(data: Dict[str, Any]) -> Dict[str, Any]:
     return cleaned
 
 
+def _json_default(obj: Any) -> Any:
+    """Stdlib json fallback for dataclasses (orjson handles them natively)"""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    return str(obj)
+
+
+def dump_json(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, with orjson when available"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option, default=str)
+    return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode('utf-8')
+
+
+def load_json(data: bytes) -> Any:
+    """Parse JSON bytes, with orjson when available"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN written by the stdlib encoder in older files
+    return json.loads(data)
+
+
 class PerformanceTimer:
     """Context manager for timing operations"""
     
@@ -148,11 +218,11 @@ class PerformanceTimer:
         self.end_time = None
     
     def __enter__(self):
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()  # monotonic, high resolution
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.end_time = time.time()
+        self.end_time = time.perf_counter()
         self.elapsed = self.end_time - self.start_time
     
     @property
@@ -165,7 +235,7 @@ def create_summary_stats(data: List[Dict[str, Any]], key_field: str = 'symbol')
     if not data:
         return {'total': 0, 'unique_symbols': 0, 'avg_processing_time': 0}
     
-    unique_symbols = len(set(item.get(key_field, '') for item in data))
+    unique_symbols = len({item.get(key_field, '') for item in data})
     
     return {
         'total_records': len(data),